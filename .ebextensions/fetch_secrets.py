@@ -8,6 +8,7 @@ In development environments, this script is not used, as a `.env` file is provid
 """
 import json
 import os
+from functools import lru_cache
 
 import boto3
 
@@ -15,6 +16,12 @@ AWS_REGION = os.getenv("AWS_REGION")
 SECRET_NAME = os.getenv("SECRET_NAME")
 
 
+@lru_cache(maxsize=1)
+def _secrets_manager_client(region):
+    """Creates the Secrets Manager client once, building a boto3 client loads its service model."""
+    return boto3.client('secretsmanager', region_name=region)
+
+
 def fetch_secrets(secret_name):
     """
     Fetch secrets from AWS Secrets Manager.
@@ -28,8 +35,7 @@ def fetch_secrets(secret_name):
     :return: Parsed JSON object containing the secret value.
     :rtype: dict
     """
-    client = boto3.client('secretsmanager', region_name=AWS_REGION)
-    response = client.get_secret_value(SecretId=secret_name)
+    response = _secrets_manager_client(AWS_REGION).get_secret_value(SecretId=secret_name)
     return json.loads(response['SecretString'])
 
 
@@ -46,5 +52,4 @@ if __name__ == "__main__":
 
     # Write secrets to a .env file that will be loaded by app into configuration
     with open(".env", "w", encoding='utf-8') as f:
-        for key, value in secrets.items():
-            f.write(f"{key}={value}\n")
+        f.write("".join(f"{key}={value}\n" for key, value in secrets.items()))
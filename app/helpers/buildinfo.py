@@ -5,9 +5,10 @@ generate, read, remove, and write build metadata based on the repository's state
 """
 import logging
 import os
-import json
 from pathlib import Path
 from datetime import datetime, timezone
+
+import orjson
 from dulwich.repo import Repo
 from dulwich.errors import NotGitRepository
 
@@ -28,8 +29,7 @@ def check_and_generate_build_info():
 
         try:
             # Load the existing `build-info.json` file into memory
-            with open(BUILD_INFO_FILE, 'r', encoding='utf-8') as f:
-                existing_build_info = json.load(f)
+            existing_build_info = orjson.loads(BUILD_INFO_FILE.read_bytes())
 
             existing_commit_date = existing_build_info.get("commit_date", "")
 
@@ -82,9 +82,10 @@ def read_build_info() -> dict:
     :raises AssertionError: If the build information file does not exist.
     :raises AssertionError: If the parsed data is not a dictionary.
     """
-    if not BUILD_INFO_FILE.exists():
-        raise AssertionError(f"Build information file does not exist: {BUILD_INFO_FILE}")
-    build_info = json.loads(BUILD_INFO_FILE.read_text())
+    try:
+        build_info = orjson.loads(BUILD_INFO_FILE.read_bytes())
+    except FileNotFoundError as e:
+        raise AssertionError(f"Build information file does not exist: {BUILD_INFO_FILE}") from e
     if not isinstance(build_info, dict):
         raise AssertionError("Build information must be a dictionary")
     return build_info
@@ -111,8 +112,7 @@ def write_empty_build_info():
         "commit_date": "",
     }
     # Write to the build-info.json file
-    with open(BUILD_INFO_FILE, 'w', encoding='utf-8') as f:
-        json.dump(build_info, f, indent=4)
+    BUILD_INFO_FILE.write_bytes(orjson.dumps(build_info, option=orjson.OPT_INDENT_2))
 
 
 def remove_build_info():
@@ -176,8 +176,7 @@ def _generate_build_info(repo: Repo = None):
         }
 
     # Write to the build-info.json file
-    with open(BUILD_INFO_FILE, 'w', encoding='utf-8') as f:
-        json.dump(build_info, f, indent=4)
+    BUILD_INFO_FILE.write_bytes(orjson.dumps(build_info, option=orjson.OPT_INDENT_2))
     logging.debug("Generated %s successfully.", BUILD_INFO_FILE)
 
 
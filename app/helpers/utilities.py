@@ -3,6 +3,7 @@ This module provides utilities for building library search URLs, rendering icons
 and computing navigation paths. It includes helper functions for escaping user input, mapping
 values to icons, and handling request referrer URLs.
 """
+from functools import lru_cache
 from urllib.parse import quote_plus, urlparse
 
 import bleach
@@ -11,6 +12,9 @@ from markupsafe import Markup
 
 PLACEHOLDER = '<span class="placeholder-icon"></span>'
 
+_ICON_TEMPLATE = '<span id="{span_id}"><i class="fa {icon}" aria-hidden="true"></i></span>'
+_PLACEHOLDER_TEMPLATE = '<span id="{span_id}">' + PLACEHOLDER + '</span>'
+
 
 _SEARCH_TEMPLATES = {
     "Los Gatos Library":
@@ -64,7 +68,8 @@ def build_library_search_urls(author, title) -> dict[str, str]:
     This function takes the author's name and the title of a work, escapes
     them to make them URL-safe, and substitutes them into predefined search
     URL templates. The result is a dictionary of search URLs for external
-    library systems or online catalog platforms.
+    library systems or online catalog platforms. The URLs are cached per
+    author and title, and each call returns a new dictionary.
 
     :param author: The name of the author to search for (must be a string).
     :type author: str
@@ -75,10 +80,15 @@ def build_library_search_urls(author, title) -> dict[str, str]:
              embedded within them.
     :rtype: dict
     """
+    return dict(_build_library_search_urls(author, title))
+
+
+@lru_cache(maxsize=256)
+def _build_library_search_urls(author, title) -> dict[str, str]:
     escaped_title = quote_plus(_strip_subtitles(title), safe="")
     escaped_author = quote_plus(author, safe="")
     search_urls = {
-        key: value.replace("{title}", escaped_title).replace("{author}", escaped_author)
+        key: value.format(title=escaped_title, author=escaped_author)
         for key, value in _SEARCH_TEMPLATES.items()
     }
     return search_urls
@@ -108,14 +118,11 @@ def render_icon(item, icon_mapping, span_id) -> Markup:
     """
     # item is the enumeration value (like 'like', 'read'),
     # icon_mapping is a dictionary mapping enum values to font-awesome icons
-    if item in icon_mapping:
-        return Markup(  # nosec B704
-            f'<span id="{span_id}">' +
-            f'<i class="fa {icon_mapping[item]}" aria-hidden="true"></i>' +
-            '</span>'
-        )
+    icon = icon_mapping.get(item)
+    if icon is not None:
+        return Markup(_ICON_TEMPLATE.format(span_id=span_id, icon=icon))  # nosec B704
     # not in mapping, just use hidden default as a spacer
-    return Markup(f'<span id="{span_id}">{PLACEHOLDER}</span>')  # nosec B704
+    return Markup(_PLACEHOLDER_TEMPLATE.format(span_id=span_id))  # nosec B704
 
 
 def compute_next_url(request):
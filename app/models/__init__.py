@@ -1,10 +1,10 @@
 """
 This module provides model imports for managing books, feedback, lists, and reading statuses.
 """
-from app.models.book import Book
+from app.models.book import Book, DEFAULT_RATING
 from app.models.feedback import Feedback, FeedbackEnum
 from app.models.reading_status import ReadingStatus, ReadingStatusEnum
 from app.models.tags import Tag, TagBook
 
-__all__ = ["Book", "Feedback", "ReadingStatus", "FeedbackEnum", "ReadingStatusEnum",
-           "Tag", "TagBook"]
+__all__ = ["Book", "DEFAULT_RATING", "Feedback", "ReadingStatus", "FeedbackEnum",
+           "ReadingStatusEnum", "Tag", "TagBook"]
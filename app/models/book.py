@@ -13,6 +13,9 @@ from app.models.feedback import Feedback
 from app.models.tags import TagBook
 from app.models.reading_status import ReadingStatus
 
+# Rating of a book added without one, and of one whose rating is cleared
+DEFAULT_RATING = 0.0
+
 
 class Book(db.Model):
     """
@@ -41,7 +44,7 @@ class Book(db.Model):
     :type categories_flat: Optional[str]
     :ivar book_description: Description of the book, if available.
     :type book_description: Optional[str]
-    :ivar rating: Rating of the book, defaults to 0.0.
+    :ivar rating: Rating of the book, defaults to `DEFAULT_RATING`.
     :type rating: float
     :ivar isbn_13: International Standard Book Number (13-digit),
         if available.
@@ -68,15 +71,19 @@ class Book(db.Model):
     image: Mapped[str | None] = mapped_column(db.Text, nullable=True)
     categories_flat: Mapped[str | None] = mapped_column(db.String(255), index=True, nullable=True)
     book_description: Mapped[str | None] = mapped_column(db.Text, nullable=True)
-    rating: Mapped[float] = mapped_column(db.Float, default=0.0, index=True, nullable=False)
+    rating: Mapped[float] = mapped_column(db.Float, default=DEFAULT_RATING,
+                                         server_default=str(DEFAULT_RATING), index=True,
+                                         nullable=False)
     isbn_13: Mapped[str | None] = mapped_column(db.String(17), index=True, nullable=True)
     isbn_10: Mapped[str | None] = mapped_column(db.String(13), index=True, nullable=True)
     hardcover: Mapped[str | None] = mapped_column(db.String(64), nullable=True)
     bestsellers_rank_flat: Mapped[str | None] = mapped_column(db.Text, nullable=True)
     specifications_flat: Mapped[str | None] = mapped_column(db.Text, nullable=True)
 
-    reading_statuses: Mapped[list["ReadingStatus"]] = relationship(back_populates="book")
-    feedbacks: Mapped[list["Feedback"]] = relationship(back_populates="book")
+    # Only ever loaded filtered to one user, so an explicit loader option is required
+    reading_statuses: Mapped[list["ReadingStatus"]] = relationship(back_populates="book",
+                                                                   lazy="raise")
+    feedbacks: Mapped[list["Feedback"]] = relationship(back_populates="book", lazy="raise")
 
     # Relationship to TagBook, connects with ListBook.book
     tags: Mapped[list['TagBook']] = relationship('TagBook',
@@ -11,7 +11,7 @@ Dependencies:
 from typing import TYPE_CHECKING
 from enum import Enum as PyEnum
 
-from sqlalchemy import ForeignKey, Enum
+from sqlalchemy import ForeignKey, Enum, Index, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship, declared_attr
 
 from app import db
@@ -66,6 +66,11 @@ class Feedback(db.Model):
     feedback: Mapped[FeedbackEnum] = mapped_column(Enum(FeedbackEnum))
     book: Mapped["Book"] = relationship(back_populates="feedbacks", lazy="joined")
 
+    # Unique constraint on (user_id, book_id), one per user per book, used to upsert
+    # Covering index, the search filters join on (user_id, book_id) and test feedback
+    __table_args__ = (UniqueConstraint("user_id", "book_id", name="unique_user_book_feedback"),
+                      Index("ix_feedback_user_book_feedback", "user_id", "book_id", "feedback"))
+
     @declared_attr
     def user(self) -> Mapped["User"]:
         """
@@ -6,7 +6,7 @@ relationships with User and Book models, and supports statuses like "up_next" an
 from typing import TYPE_CHECKING
 from enum import Enum as PyEnum
 
-from sqlalchemy import ForeignKey, Enum
+from sqlalchemy import ForeignKey, Enum, Index, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship, declared_attr
 
 from app import db
@@ -43,6 +43,11 @@ class ReadingStatus(db.Model):
     status: Mapped[ReadingStatusEnum] = mapped_column(Enum(ReadingStatusEnum))
     book: Mapped["Book"] = relationship(back_populates="reading_statuses", lazy="joined")
 
+    # Unique constraint on (user_id, book_id), one per user per book, used to upsert
+    # Covering index, the search filters join on (user_id, book_id) and test status
+    __table_args__ = (UniqueConstraint("user_id", "book_id", name="unique_user_book_status"),
+                      Index("ix_reading_status_user_book_status", "user_id", "book_id", "status"))
+
     @declared_attr
     def user(self) -> Mapped["User"]:
         """
@@ -13,7 +13,7 @@ Relationships:
     - Books can belong to multiple tags, and tags can include multiple books.
 """
 from sqlalchemy.orm import relationship, Mapped, mapped_column
-from sqlalchemy import ForeignKey, UniqueConstraint
+from sqlalchemy import ForeignKey, Index, UniqueConstraint
 from app import db
 
 
@@ -42,8 +42,9 @@ class Tag(db.Model):
     # Color for the tag when displayed visually
     color: Mapped[str] = mapped_column(db.String(32), nullable=False)
 
-    # Unique constraint on (name, owner_id)
-    __table_args__ = (UniqueConstraint("name", "owner_id", name="unique_name_per_owner"),)
+    # Unique constraint on (name, owner_id), and an index to scan a user's tags by name
+    __table_args__ = (UniqueConstraint("name", "owner_id", name="unique_name_per_owner"),
+                      Index("ix_tags_owner_name", "owner_id", "name"))
 
     # Relationship to the user who owns this tag
     owner: Mapped["User"] = relationship("User", back_populates="tags")  # type: ignore
@@ -87,8 +88,10 @@ class TagBook(db.Model):
     # Relationship assuming a Book model for book-specific information
     book = relationship('Book', back_populates='tags')
 
-    # Unique constraint on (tag_id, book_id) pair
-    __table_args__ = (UniqueConstraint("tag_id", "book_id", name="unique_tag_book_pair"),)
+    # Unique constraint on (tag_id, book_id) pair, and an index covering the tag ids of a
+    # book for the tag filter of searches
+    __table_args__ = (UniqueConstraint("tag_id", "book_id", name="unique_tag_book_pair"),
+                      Index("ix_tag_books_book_tag", "book_id", "tag_id"))
 
     def __repr__(self) -> str:
         return (
@@ -6,6 +6,7 @@ user inputs, and interaction with both the database and external services as req
 """
 import csv
 import io
+from functools import partial
 
 from flask import (current_app as app, render_template, request, jsonify,
                    flash, redirect, url_for, make_response, Request, Response)
@@ -19,7 +20,7 @@ from app.services import (fetch_product_details, build_about_info, search_by_cat
                           search_by_author, get_tags_for_user, get_or_create_tag,
                           tag_book, find_tag_for_user, get_tags_and_colors, remove_tag_from_book,
                           get_tags_for_user_with_colors, search_by_title, add_new_book,
-                          book_to_dict_with_status_and_feedback, set_book_status, set_book_feedback,
+                          get_book_dict_for_user, set_book_status, set_book_feedback,
                           update_book, del_book, get_category_bs_tree, id_to_fullpath)
 
 
@@ -89,12 +90,10 @@ def details():
     parameter `id`.   For logged on users, the feedback and reading status
     of the book are also returned.
     """
-    error, status, book = _check_for_required_book(request)
+    error, status, book_dict = _check_for_required_book(request, fetch=get_book_dict_for_user)
     if error:
         return error, status
 
-    user_id = current_user.id if current_user.is_authenticated else None
-    book_dict = book_to_dict_with_status_and_feedback(book, user_id)
     return jsonify(book_dict)
 
 
@@ -544,7 +543,8 @@ def _check_for_required_tag_and_book(req, tag_create=False) -> (Tag, Book, Respo
     return tag, book, None, 200
 
 
-def _check_for_required_book(req):
+def _check_for_required_book(req, fetch=partial(get_book_by_id, load_status=True,
+                                                 load_feedback=True)):
     """
     Validates the presence and format of the 'id' parameter in the request and retrieves the
     associated book object. If the 'id' is missing or invalid, or if the book does not exist, 
@@ -553,6 +553,11 @@ def _check_for_required_book(req):
     :param req: The Flask request object containing query parameters.
                 Expects the 'id' parameter in the request arguments.
     :type req: flask.Request
+    :param fetch: Called with the book id and the current user's id, or None when no
+                  user is logged in, and returns the book or None when it does not
+                  exist.  Defaults to `get_book_by_id` with the user's reading status
+                  and feedback loaded.
+    :type fetch: Callable
     :return: A tuple containing:
              - An error response (if applicable) or None,
              - The corresponding HTTP status code,
@@ -563,9 +568,7 @@ def _check_for_required_book(req):
     if not book_id or not book_id.isdigit():
         return jsonify({"error": "Invalid or missing 'id' parameter"}), 400, None
 
-    book = get_book_by_id(book_id,
-                          current_user.id if current_user.is_authenticated else None,
-                          load_status=True, load_feedback=True)
+    book = fetch(int(book_id), current_user.id if current_user.is_authenticated else None)
     if not book:
         return jsonify({"error": f"Book {book_id} not found"}), 404, None
 
@@ -208,3 +208,18 @@ class UserTagModelView(ModelView):
         if is_created:
             model.owner_id = current_user.id
         super().on_model_change(form, model, is_created)
+
+    def after_model_change(self, _form, _model, _is_created):
+        """Discard the current user's cached searches, which show their tags."""
+        _invalidate_user_searches()
+
+    def after_model_delete(self, _model):
+        """Discard the current user's cached searches, which show their tags."""
+        _invalidate_user_searches()
+
+
+def _invalidate_user_searches():
+    # imported here, the services need the models, which aren't set up yet when this
+    # module is imported
+    from app.services import invalidate_search_cache  # pylint: disable=import-outside-toplevel
+    invalidate_search_cache(current_user.id)
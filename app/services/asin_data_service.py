@@ -7,6 +7,7 @@ such as title, authors, categories, ratings, and ISBN. The module is
 designed to be integrated with a Flask application and requires a valid API key 
 to function.
 """
+import orjson
 import requests
 from flask import current_app
 
@@ -55,43 +56,60 @@ def fetch_product_details(asin):
     response = requests.get(api_url, params, timeout=30)
     response.raise_for_status()  # Raise HTTPError for bad responses (4xx and 5xx)
 
-    catalog_data = response.json()
-    if catalog_data.get('product'):
-        product = catalog_data.get('product')
-        if product:
-            # these attributes are simple pass-throughs
-            attributes = [
-                'title',
-                'asin',
-                'book_description',
-                'rating',
-                'link',
-                'bestsellers_rank_flat',
-                'specifications_flat'
-            ]
-            return_value = {}
-            for attribute in attributes:
-                if product.get(attribute):
-                    return_value[attribute] = sanitize(product[attribute])
-            # Special processing attributes
-            if product.get('authors'):
-                return_value['author'] = sanitize(product['authors'][0]['name'])
-            if product.get('categories'):
-                cat_list = [c['name'] for c in product['categories'] if 'name' in c]
-                return_value['categories_flat'] = sanitize_categories_flat(' > '.join(cat_list))
-            if product.get('main_image'):
-                return_value['image'] = product['main_image']['link']
-            if product.get('specifications'):
-                specs = product['specifications']
-                hardcover_str = next((s['value'] for s in specs if s['name'] == 'Hardcover'), None)
-                if hardcover_str:
-                    return_value['hardcover'] = sanitize(hardcover_str)
-                isbn_10_str = next((s['value'] for s in specs if s['name'] == 'ISBN-10'), None)
-                if isbn_10_str:
-                    return_value['isbn_10'] = sanitize(isbn_10_str)
-                isbn_13_str = next((s['value'] for s in specs if s['name'] == 'ISBN-13'), None)
-                if isbn_13_str:
-                    return_value['isbn_13'] = sanitize(isbn_13_str)
+    catalog_data = orjson.loads(response.content)
+    product = catalog_data.get('product')
+    if not product:
+        return {}  # empty if errors
 
-            return return_value
-    return {}  # empty if errors
+    # these attributes are simple pass-throughs
+    attributes = [
+        'title',
+        'asin',
+        'book_description',
+        'rating',
+        'link',
+        'bestsellers_rank_flat',
+        'specifications_flat'
+    ]
+    return_value = {}
+    for attribute in attributes:
+        if value := product.get(attribute):
+            return_value[attribute] = sanitize(value)
+    # Special processing attributes
+    authors = product.get('authors')
+    if authors and isinstance(authors, list):
+        return_value['author'] = sanitize(authors[0]['name'])
+    if categories := product.get('categories'):
+        cat_list = [c['name'] for c in categories if 'name' in c]
+        return_value['categories_flat'] = sanitize_categories_flat(' > '.join(cat_list))
+    if main_image := product.get('main_image'):
+        return_value['image'] = main_image['link']
+    if specs := product.get('specifications'):
+        return_value.update(_specifications_to_attributes(specs))
+
+    return return_value
+
+
+# product specification names mapped to the attributes they populate
+_SPECIFICATION_ATTRIBUTES = {
+    'Hardcover': 'hardcover',
+    'ISBN-10': 'isbn_10',
+    'ISBN-13': 'isbn_13'
+}
+
+
+def _specifications_to_attributes(specs):
+    """
+    Extracts the hardcover and ISBN attributes from a product's specifications.
+
+    :param specs: The list of `{'name': ..., 'value': ...}` specification entries
+        of a product returned by the ASIN Data API.
+    :return: A dictionary of the sanitized attribute values found, keyed by
+        attribute name. The first entry wins when a specification is repeated.
+    """
+    attributes = {}
+    for spec in specs:
+        attribute = _SPECIFICATION_ATTRIBUTES.get(spec.get('name'))
+        if attribute and attribute not in attributes and (value := spec.get('value')):
+            attributes[attribute] = sanitize(value)
+    return attributes
@@ -2,14 +2,18 @@
 Services for working with books
 """
 # pylint: disable=raise-missing-from
-from sqlalchemy import update, delete
+from sqlalchemy import and_, delete, lambda_stmt, select, update
+from sqlalchemy.dialects.mysql import insert
 from sqlalchemy.exc import IntegrityError, InvalidRequestError
-from sqlalchemy.orm import noload, joinedload
+from sqlalchemy.orm import noload, joinedload, raiseload
 
 from app import db
 from app.forms import BookForm
 from app.helpers.utilities import sanitize, sanitize_categories_flat
-from app.models import Book, Feedback, ReadingStatus, FeedbackEnum, ReadingStatusEnum
+from app.models import (Book, Feedback, ReadingStatus, FeedbackEnum, ReadingStatusEnum,
+                        DEFAULT_RATING)
+from app.services.category_service import invalidate_category_tree_cache
+from app.services.search_service import invalidate_search_cache
 
 
 def get_book_by_id(book_id, user_id=None, load_status=False, load_feedback=False):
@@ -22,7 +26,9 @@ def get_book_by_id(book_id, user_id=None, load_status=False, load_feedback=False
     Otherwise, the relationships will not be loaded.
 
     This function is designed to optimize database queries by controlling the
-    loading of related entities, reducing unnecessary data retrieval.
+    loading of related entities, reducing unnecessary data retrieval. Any other
+    relationship of the returned book is set to raise on access rather than
+    silently issue a lazy load.
 
     :param book_id: Unique identifier of the book to be fetched.
     :type book_id: int
@@ -64,6 +70,9 @@ def get_book_by_id(book_id, user_id=None, load_status=False, load_feedback=False
     else:
         query = query.options(noload(Book.feedbacks))
 
+    # Any other relationship is not expected to be touched, raise instead of silently lazy loading
+    query = query.options(raiseload('*'))
+
     # If no ReadingStatus or Feedback records exist, the book will still be returned,
     # but relationships will be empty lists.
     return query.filter_by(id=book_id).first()
@@ -89,23 +98,11 @@ def add_new_book(book_form: BookForm) -> Book:
     """
     try:
         # Create and add the new book
-        new_book = Book(
-            author=sanitize(book_form.author.data),
-            title=sanitize(book_form.title.data),
-            asin=sanitize(book_form.asin.data),
-            link=book_form.link.data,  # form validator checked this
-            image=book_form.image.data,  # form validator checked this
-            categories_flat=sanitize_categories_flat(book_form.categories_flat.data),
-            book_description=sanitize(book_form.book_description.data),
-            rating=book_form.rating.data or 0.0,
-            isbn_13=sanitize(book_form.isbn_13.data),
-            isbn_10=sanitize(book_form.isbn_10.data),
-            hardcover=sanitize(book_form.hardcover.data),
-            bestsellers_rank_flat=sanitize(book_form.bestsellers_rank_flat.data),
-            specifications_flat=sanitize(book_form.specifications_flat.data),
-        )
+        new_book = Book(**_book_form_to_kwargs(book_form))
         db.session.add(new_book)
         db.session.commit()
+        invalidate_category_tree_cache()
+        invalidate_search_cache()
     except IntegrityError:
         db.session.rollback()
         raise ValueError("A book with the same unique constraint already exists.")
@@ -120,11 +117,12 @@ def add_new_book(book_form: BookForm) -> Book:
 
 def update_book(book_form: BookForm) -> Book:
     """
-    Updates the details of an existing book in the database. It retrieves the book
-    based on the provided ID in the book form, updates the book's attributes with new
-    data, and commits the changes to the database. In the case of any errors during
-    the database operation, the session is rolled back and appropriate exceptions
-    are raised.
+    Updates the details of an existing book in the database. The book identified by
+    the ID in the book form is updated in place with a single UPDATE statement,
+    without reading it first, and the changes are committed to the database. The
+    updated book is then fetched once to be returned. In the case of any errors
+    during the database operation, the session is rolled back and appropriate
+    exceptions are raised.
 
     :param book_form: Form containing updated data for a book
     :type book_form: BookForm
@@ -134,24 +132,19 @@ def update_book(book_form: BookForm) -> Book:
     :raises RuntimeError: Raised in case of a database request error or any unexpected error
     """
     try:
-        book = get_book_by_id(book_form.id.data)
-        # Update the new book
-        book.author = sanitize(book_form.author.data)
-        book.title = sanitize(book_form.title.data)
-        book.asin = sanitize(book_form.asin.data)
-        book.link = book_form.link.data  # handled in the form validator
-        book.image = book_form.image.data  # handled in the form validator
-        book.categories_flat = sanitize_categories_flat(book_form.categories_flat.data)
-        book.book_description = sanitize(book_form.book_description.data)
-        book.rating = book_form.rating.data or 0.0
-        book.isbn_13 = sanitize(book_form.isbn_13.data)
-        book.isbn_10 = sanitize(book_form.isbn_10.data)
-        book.hardcover = sanitize(book_form.hardcover.data)
-        book.bestsellers_rank_flat = sanitize(book_form.bestsellers_rank_flat.data)
-        book.specifications_flat = sanitize(book_form.specifications_flat.data)
-
-        # Update the book in the database
+        book_id = book_form.id.data
+        values = _book_form_to_kwargs(book_form)
+        # A cleared rating goes back to the column default, as for a new book
+        values.setdefault('rating', DEFAULT_RATING)
+        # Update the book in the database, no need to load it first
+        result = db.session.execute(update(Book).where(Book.id == book_id).values(**values))
+        if result.rowcount == 0:
+            raise ValueError(f"Book with ID {book_id} not found.")
+
         db.session.commit()
+        invalidate_category_tree_cache()
+        invalidate_search_cache()
+        book = db.session.get(Book, book_id)
     except IntegrityError:
         db.session.rollback()
         raise ValueError("A book with the same unique constraint already exists.")
@@ -168,22 +161,56 @@ def del_book(book_id):
     """
     Deletes a book from the database based on the provided book ID.
 
+    The book is deleted with a single DELETE statement, without loading it first. Its
+    reading statuses, feedback and tag assignments are removed by the database's
+    ON DELETE CASCADE foreign keys.
+
     :param book_id: The ID of the book to delete.
     :type book_id: int
     :raises ValueError: If no book with the specified ID is found.
     """
     try:
-        book = get_book_by_id(book_id)
-        if not book:
+        result = db.session.execute(delete(Book).where(Book.id == book_id))
+        if result.rowcount == 0:
             raise ValueError(f"Book with ID {book_id} not found.")
 
-        db.session.delete(book)
         db.session.commit()
+        invalidate_category_tree_cache()
+        invalidate_search_cache()
+    except ValueError:
+        db.session.rollback()
+        raise
     except Exception as e:
         db.session.rollback()
         raise RuntimeError(f"An error occurred while deleting the book: {e}")
 
 
+# Free-text form fields that are stored after stripping any HTML
+_SANITIZED_BOOK_FORM_FIELDS = ('author', 'title', 'asin', 'book_description', 'isbn_13',
+                               'isbn_10', 'hardcover', 'bestsellers_rank_flat',
+                               'specifications_flat')
+
+
+def _book_form_to_kwargs(book_form: BookForm) -> dict:
+    """
+    Reads the book attributes out of a submitted form exactly once, applying the same
+    sanitizing and defaults used when adding or updating a book.
+
+    :param book_form: The validated form containing the book data.
+    :type book_form: BookForm
+    :return: A dictionary of Book attribute names to their cleaned values.
+    :rtype: dict
+    """
+    kwargs = {field: sanitize(getattr(book_form, field).data)
+              for field in _SANITIZED_BOOK_FORM_FIELDS}
+    kwargs['link'] = book_form.link.data  # form validator checked this
+    kwargs['image'] = book_form.image.data  # form validator checked this
+    kwargs['categories_flat'] = sanitize_categories_flat(book_form.categories_flat.data)
+    if (rating := book_form.rating.data) is not None:
+        kwargs['rating'] = rating  # when missing, the column default applies
+    return kwargs
+
+
 def get_book_status(book_id, user_id) -> ReadingStatusEnum:
     """
     Retrieve the reading status of a book for a specific user.
@@ -203,9 +230,10 @@ def get_book_status(book_id, user_id) -> ReadingStatusEnum:
         is found.
     :rtype: ReadingStatusEnum | None
     """
-    query = (db.session.query(ReadingStatus.status)
-             .filter(ReadingStatus.book_id == book_id, ReadingStatus.user_id == user_id))
-    row = query.one_or_none()
+    # lambda_stmt caches the compiled SQL, book_id and user_id become bound parameters
+    stmt = lambda_stmt(lambda: select(ReadingStatus.status)
+                       .where(ReadingStatus.book_id == book_id, ReadingStatus.user_id == user_id))
+    row = db.session.execute(stmt).one_or_none()
     return row.status if row else None
 
 
@@ -220,9 +248,10 @@ def get_book_feedback(book_id, user_id) -> FeedbackEnum:
     :param user_id: ID of the user providing the feedback
     :return: FeedbackEnum representing the feedback if found, otherwise None
     """
-    query = (db.session.query(Feedback.feedback)
-             .filter(Feedback.book_id == book_id, Feedback.user_id == user_id))
-    row = query.one_or_none()
+    # lambda_stmt caches the compiled SQL, book_id and user_id become bound parameters
+    stmt = lambda_stmt(lambda: select(Feedback.feedback)
+                       .where(Feedback.book_id == book_id, Feedback.user_id == user_id))
+    row = db.session.execute(stmt).one_or_none()
     return row.feedback if row else None
 
 
@@ -244,36 +273,21 @@ def set_book_status(book_id: int, status: str, user_id: int) -> dict:
         status and feedback for the given user.
     :rtype: dict
     """
-    # Check if the reading status already exists for this user_id and book_id
-    existing_status = db.session.query(
-        ReadingStatus.id,
-        ReadingStatus.status).filter_by(
-        user_id=user_id,
-        book_id=book_id
-    ).first()
-
-    # If "none", delete the reading status
     if status == "none":
-        if existing_status:
-            db.session.execute(
-                delete(ReadingStatus)
-                .where(ReadingStatus.id == existing_status.id)
-            )
+        # If "none", delete any reading status, no need to look for it first
+        stmt = lambda_stmt(lambda: delete(ReadingStatus)
+                           .where(ReadingStatus.user_id == user_id,
+                                  ReadingStatus.book_id == book_id))
     else:
-        if existing_status:
-            # Update the current reading status
-            db.session.execute(
-                update(ReadingStatus)
-                .where(ReadingStatus.id == existing_status.id)
-                .values(status=status)
-            )
-        else:
-            # Add a new reading status
-            new_status = ReadingStatus(user_id=user_id, book_id=book_id, status=status)
-            db.session.add(new_status)
+        # Insert the reading status or update it in place, keyed by unique (user_id, book_id)
+        stmt = lambda_stmt(lambda: insert(ReadingStatus)
+                           .values(user_id=user_id, book_id=book_id, status=status))
+        stmt += lambda s: s.on_duplicate_key_update(status=s.inserted.status)
+    db.session.execute(stmt)
 
     # Commit the transaction
     db.session.commit()
+    invalidate_search_cache(user_id)
 
 
 def set_book_feedback(book_id: int, fb: str, user_id: int) -> dict:
@@ -283,90 +297,57 @@ def set_book_feedback(book_id: int, fb: str, user_id: int) -> dict:
     feedback is marked as "none", the existing feedback will be removed. If no feedback exists,
     a new entry will be created. Finally, the updated book details are fetched and returned.
     """
-    # Check if feedback already exists for this user_id and book_id
-    existing_feedback = db.session.query(
-        Feedback.id,
-        Feedback.feedback).filter_by(
-        user_id=user_id,
-        book_id=book_id
-    ).first()
-
-    # If "none", delete the feedback
     if fb == "none":
-        if existing_feedback:
-            db.session.execute(
-                delete(Feedback)
-                .where(Feedback.id == existing_feedback.id)
-            )
+        # If "none", delete any feedback, no need to look for it first
+        stmt = lambda_stmt(lambda: delete(Feedback)
+                           .where(Feedback.user_id == user_id, Feedback.book_id == book_id))
     else:
-        if existing_feedback:
-            # Update existing feedback
-            db.session.execute(
-                update(Feedback)
-                .where(Feedback.id == existing_feedback.id)
-                .values(feedback=fb)
-            )
-        else:
-            # Insert new feedback if it wasn't there
-            new_feedback = Feedback(user_id=user_id, book_id=book_id, feedback=fb)
-            db.session.add(new_feedback)
+        # Insert the feedback or update it in place, keyed by unique (user_id, book_id)
+        stmt = lambda_stmt(lambda: insert(Feedback)
+                           .values(user_id=user_id, book_id=book_id, feedback=fb))
+        stmt += lambda s: s.on_duplicate_key_update(feedback=s.inserted.feedback)
+    db.session.execute(stmt)
 
     # Commit the transaction
     db.session.commit()
+    invalidate_search_cache(user_id)
 
 
-def book_to_dict_with_status_and_feedback(book, user_id):
+def get_book_dict_for_user(book_id, user_id):
     """
-    Converts a book object to a dictionary representation while appending user's
-    feedback and reading status when available. This function ensures that the
-    resulting dictionary contains accurately mapped data for feedback and status
-    for a specified user.
-
-    If `book.feedbacks` or `book.reading_statuses` are available, the feedback
-    and status values are extracted from these lists respectively. If unavailable
-    or empty, the function queries for the user's feedback or status using
-    appropriate functions. Default values are assigned when feedback or status
-    is missing or uninitialized.
-
-    Parameters
-    ----------
-    :param book:
-        The book object containing attributes and possibly associated feedbacks
-        and reading statuses.
-    :param user_id:
-        The unique identifier of the user for whom feedback and status are
-        retrieved.
-
-    Returns
-    -------
-    :return:
-        A dictionary representation of the book object with additional `feedback`
-        and `status` keys reflecting the user's interaction with the book.
-    :rtype: dict
+    Fetches a book as a dictionary, together with the user's feedback and reading
+    status, in a single SELECT.
+
+    The user's reading status and feedback are LEFT JOINed on their unique
+    (user_id, book_id) keys and read as plain columns, so no relationship is loaded.
+    A missing feedback or reading status is reported as 'none'.
+
+    :param book_id: Unique identifier of the book to be fetched.
+    :type book_id: int
+    :param user_id: Unique identifier of the user whose feedback and status are
+        included, or None to return only the book attributes.
+    :type user_id: int, optional
+    :return: A dictionary representation of the book with `feedback` and `status`
+        keys for the user, or None if no book matches `book_id`.
+    :rtype: dict or None
     """
+    if not user_id:
+        book = db.session.get(Book, book_id)
+        return book.to_dict() if book else None
+
+    stmt = (
+        select(Book, ReadingStatus.status, Feedback.feedback)
+        .outerjoin(ReadingStatus, and_(ReadingStatus.book_id == Book.id,
+                                       ReadingStatus.user_id == user_id))
+        .outerjoin(Feedback, and_(Feedback.book_id == Book.id, Feedback.user_id == user_id))
+        .where(Book.id == book_id)
+    )
+    row = db.session.execute(stmt).one_or_none()
+    if row is None:
+        return None
+
+    book, status, feedback = row
     book_dict = book.to_dict()
-    if user_id:
-        if book.feedbacks is not None and book.feedbacks != []:
-            #  Assume it's a list with one thing in it, grab the first Feedback and get feedback
-            book_dict['feedback'] = book.feedbacks[0].feedback.value
-        elif book.feedbacks is None:
-            #  Know nothing, query feedback then
-            fb = get_book_feedback(book_dict['id'], user_id)
-            if fb:
-                book_dict['feedback'] = fb.value
-        else:
-            # Empty list, then, no feedback.  Set to None
-            book_dict['feedback'] = 'none'
-
-        if book.reading_statuses is not None and book.reading_statuses != []:
-            #  Assume it's a list with one thing in it, get the first Reading_Status and get status
-            book_dict['status'] = book.reading_statuses[0].status.value
-        elif book.reading_statuses is None:
-            #  Know noting, query db
-            status = get_book_status(book_dict['id'], user_id)
-            if status:
-                book_dict['status'] = status.value
-        else:
-            # Empty list, then no status.  Set to None
-            book_dict['status'] = 'none'
+    book_dict['feedback'] = feedback.value if feedback else 'none'
+    book_dict['status'] = status.value if status else 'none'
     return book_dict
@@ -6,67 +6,93 @@ trees, and fetch unique categories from the database. The module is designed for
 building Bootstrap-compatible tree structures for UI representations.
 """
 import base64
+from functools import lru_cache
+
+from sqlalchemy import func, literal, select
 
 from app import db
 from app.models import Book
 
 
+_CATEGORY_TREE_CACHE_KEY = "category_bs_tree"
+
+# Initial state of every tree node, shared since the tree is only ever serialized
+_UNCHECKED_STATE = {"checked": False}
+
+
 def get_category_bs_tree():
     """
-    Constructs and returns a Bootstrap-formatted tree representation of categories.
+    Returns the Bootstrap-formatted tree representation of categories.
+
+    The tree only changes when books are added, updated or deleted, so it is built
+    once and kept in the application cache until `invalidate_category_tree_cache`
+    is called or the cache entry times out.
+
+    :return: A list of dictionaries representing the category tree in a structure
+        compatible with Bootstrap frameworks.
+    :rtype: list[dict]
+    """
+    from app import cache  # pylint: disable=import-outside-toplevel
+
+    bs_tree = cache.get(_CATEGORY_TREE_CACHE_KEY)
+    if bs_tree is None:
+        bs_tree = _build_category_bs_tree()
+        cache.set(_CATEGORY_TREE_CACHE_KEY, bs_tree)
+    return bs_tree
+
+
+def invalidate_category_tree_cache():
+    """
+    Discards the cached category tree so the next request rebuilds it from the
+    database. Call after any change to the books table has been committed.
+    """
+    from app import cache  # pylint: disable=import-outside-toplevel
+
+    cache.delete(_CATEGORY_TREE_CACHE_KEY)
+
 
-    The function retrieves a hierarchical category tree and processes it into a
-    format suitable for a Bootstrap UI component. Each item in the resulting tree
-    contains metadata such as the category name, a unique id based on its full path,
-    and a checked state.
+def _build_category_bs_tree():
+    """
+    Constructs and returns a Bootstrap-formatted tree representation of categories.
 
-    :raises ValueError: If the category tree data is malformed.
+    The database expands every category string into its distinct path prefixes, sorted
+    so that a parent always comes before its children. The tree is then built in a
+    single pass, attaching each node to the already built node for its parent path.
+    Each item in the resulting tree contains metadata such as the category name, a
+    unique id based on its full path, and a checked state.
 
     :return: A list of dictionaries representing the category tree in a structure
         compatible with Bootstrap frameworks.
     :rtype: list[dict]
     """
-    def _add_categories(cat, context, tree, children):
-        """
-        Adds a category and its subcategories to the tree representation.
-
-        The function recursively creates a tree structure, where each node represents
-        a category. Each category node is stored as a dictionary with information about 
-        the category's text, state (e.g., checked or unchecked), the full path to the 
-        category, and an identifier. If the category has children, they are also added 
-        to the tree recursively.
-
-        :param cat: The current category name being added.
-        :type cat: str
-        :param context: The current hierarchical path leading to the category.
-        :type context: str
-        :param tree: A list representing the current level of the tree structure.
-        :type tree: list
-        :param children: A dictionary of child categories, where the keys are child 
-            category names, and the values are their respective sub-children.
-        :type children: dict
-        :return: None
-        """
-        fullpath = context + _SEPARATOR + cat if context else cat
-        node = {
-            "text": cat,
-            "state": {"checked": False},
-            "fullpath": fullpath,
-            "id": _fullpath_to_id(fullpath)
-        }
-        tree.append(node)
-        if children:
-            node["nodes"] = []
-            for child in children:
-                _add_categories(child, fullpath, node["nodes"], children[child])
-
-    categories = _get_category_tree()
     bs_tree = []
-    for category, subcategories in categories.items():
-        _add_categories(category, '', bs_tree, subcategories)
+    nodes_by_fullpath = {}
+
+    def get_or_create_node(fullpath):
+        node = nodes_by_fullpath.get(fullpath)
+        if node is None:
+            parent_path, _, cat = fullpath.rpartition(_SEPARATOR)
+            node = {
+                "text": cat,
+                "state": _UNCHECKED_STATE,
+                "fullpath": fullpath,
+                "id": _fullpath_to_id(fullpath)
+            }
+            if parent_path:
+                # Normally the parent was already built; create it if the prefixes
+                # came back without it so the node is never promoted to the root
+                get_or_create_node(parent_path).setdefault("nodes", []).append(node)
+            else:
+                bs_tree.append(node)
+            nodes_by_fullpath[fullpath] = node
+        return node
+
+    for fullpath in _get_category_prefixes():
+        get_or_create_node(fullpath)
     return bs_tree
 
 
+@lru_cache(maxsize=4096)
 def id_to_fullpath(encoded_id):
     """
     Decodes a URL-safe HTML id string back into the original fullpath using Base64.
@@ -79,96 +105,86 @@ def id_to_fullpath(encoded_id):
     :return: The original fullpath string.
     :rtype: str
     """
-    safe_decoded = (encoded_id
-                    .replace('-', '+')
-                    .replace('_', '/')
-                    .replace('*', '='))
-    decoded = base64.b64decode(safe_decoded).decode('utf-8')
-    return decoded
+    return base64.urlsafe_b64decode(encoded_id.replace('*', '=').encode('ascii')).decode('utf-8')
 
 
-def _get_category_list():
-    """
-    Fetches a list of unique book categories from the database sorted in alphabetical
-    order.
+_SEPARATOR = ' > '   # separator for full category strings
+_BINARY_COLLATION = 'utf8mb4_bin'   # exact comparison of category path prefixes
+_CATEGORY_COLLATION = 'utf8mb4_unicode_ci'   # books.categories_flat collation, display order
+
 
-    The function establishes a database connection and executes an SQL query to
-    retrieve distinct book categories from the database. After
-    retrieving the results, the function processes and returns the list of unique
-    categories.
+def _get_category_prefixes():
+    """
+    Fetches every distinct category path prefix from the database, sorted in
+    alphabetical order.
+
+    A recursive CTE expands each distinct `categories_flat` value such as
+    'A > B > C' into the prefixes 'A', 'A > B' and 'A > B > C', so the hierarchy is
+    produced by the database instead of splitting and nesting strings in Python.
+    Prefixes are made distinct with a binary collation, so paths differing only in
+    case or accents stay distinct. They are sorted with the column's own collation,
+    the order users have always seen, with the binary order breaking ties between
+    case or accent variants. A prefix sorts before any longer path that starts with
+    it, so parents precede their children in the result.
 
     :raises sqlalchemy.exc.SQLAlchemyError: If there is an error executing the
         SQL query or an issue with the database connection.
 
-    :return: A list of strings containing distinct book categories sorted
+    :return: A list of strings containing distinct category path prefixes sorted
         alphabetically.
     :rtype: list[str]
     """
-    result = (db.session.query(Book.categories_flat)
-              .distinct()
-              .order_by(Book.categories_flat)
-              .all())
-
-    # Extracting the results into a list
-    categories = [row.categories_flat for row in result]
-    return categories
-
-
-_SEPARATOR = ' > '   # separator for full category strings
-
-
-def _get_category_tree():
-    """
-    Builds a hierarchical tree of categories from a flat list of category strings
-    separated by ' > '. Each category string represents a path, where top-level
-    categories are separated by '>' from their respective subcategories.
-
-    The function `get_category_tree` iterates through a list of categories to
-    construct a nested dictionary structure representing the hierarchical
-    relationship among categories. An auxiliary recursive function `_add_categories`
-    is used to process each category path and build the tree.
-
-    :raises None: This function does not raise any errors.
-
-    :return: A dictionary where keys are category names and values are nested
-        dictionaries representing subcategories.
-    :rtype: dict
-    """
-    def _add_categories(cat, tree, sub_categories):
-        if cat not in tree:
-            tree[cat] = {}
-        if sub_categories:
-            # remove first subcategory and make sub_categories list smaller
-            sub_category = sub_categories.pop(0)
-            _add_categories(sub_category, tree[cat], sub_categories)
-
-    categories = _get_category_list()
-    category_tree = {}
-    for category in categories:
-        categories = category.split(_SEPARATOR)
-        top_level_category = categories.pop(0)
-        _add_categories(top_level_category, category_tree, categories)
-    return category_tree
-
-
+    category_prefixes = (
+        select(
+            Book.categories_flat.collate(_BINARY_COLLATION).label("categories_flat"),
+            literal(1).label("depth"),
+            func.substring_index(Book.categories_flat, _SEPARATOR, 1).label("fullpath")
+        )
+        .where(Book.categories_flat.isnot(None))
+        .distinct()
+        .cte("category_prefixes", recursive=True)
+    )
+    category_prefixes = category_prefixes.union_all(
+        select(
+            category_prefixes.c.categories_flat,
+            category_prefixes.c.depth + 1,
+            func.substring_index(category_prefixes.c.categories_flat, _SEPARATOR,
+                                 category_prefixes.c.depth + 1)
+        )
+        .where(category_prefixes.c.fullpath != category_prefixes.c.categories_flat)
+    )
+    # Compare with a binary collation: the column's case and accent insensitive
+    # collation would let DISTINCT fold 'fiction' into 'Fiction', leaving
+    # 'fiction > B' without a matching parent.
+    distinct_prefixes = (
+        select(category_prefixes.c.fullpath.collate(_BINARY_COLLATION).label("fullpath"))
+        .distinct()
+        .subquery("distinct_prefixes")
+    )
+    # Sorted outside the DISTINCT, which only allows ordering by the selected expression
+    fullpath = distinct_prefixes.c.fullpath
+    query = (select(fullpath)
+             .order_by(fullpath.collate(_CATEGORY_COLLATION), fullpath))
+
+    # Plain strings, no need to wrap each one in a Row
+    return db.session.scalars(query).all()
+
+
+@lru_cache(maxsize=4096)
 def _fullpath_to_id(fullpath):
     """
     Converts a fullpath string into a URL-safe HTML id by encoding it using Base64.
 
-    The transformation encodes the input as a Base64 string, replaces URL-sensitive
-    characters, and ensures that the resulting id strings are unique and reversible.
+    The transformation encodes the input with the URL-safe Base64 alphabet and replaces
+    the '=' padding with '*', ensuring that the resulting id strings are unique and
+    reversible.
 
     :param fullpath: The original fullpath string to be converted.
     :type fullpath: str
     :return: A URL-safe Base64-encoded HTML id string.
     :rtype: str
     """
-    encoded = base64.b64encode(fullpath.encode('utf-8')).decode('utf-8')
-    safe_encoded = (encoded
-                    .replace('+', '-')
-                    .replace('/', '_')
-                    .replace('=', '*'))
-    return safe_encoded
+    return base64.urlsafe_b64encode(fullpath.encode('utf-8')).replace(b'=', b'*').decode('ascii')
 
 
-__all__ = ['get_category_bs_tree', 'id_to_fullpath']
+__all__ = ['get_category_bs_tree', 'invalidate_category_tree_cache', 'id_to_fullpath']
@@ -6,14 +6,54 @@ filters for user-specific status and feedback. The queries are tailored to retur
 sorted results, refined to meet various search criteria. If a user is authenticated,
 search results will include personalized status and feedback data.
 """
+import threading
+from functools import lru_cache
+
+from cachetools import TTLCache
+from flask import g
 from flask_security import current_user
-from sqlalchemy import asc, and_, exists, select, literal
-from sqlalchemy.orm import contains_eager, noload, make_transient
+from sqlalchemy import asc, and_, exists
+from sqlalchemy.orm import (joinedload, load_only, noload, raiseload, selectinload,
+                            with_loader_criteria)
 
 from app import db
 from app.models import Book, ReadingStatus, Feedback, TagBook, Tag
 
 
+# Recent search results, reused for identical searches by the same user, like a search
+# followed by the download of its results. The books are kept in process rather than in
+# the app cache since ORM instances loaded with per-user loader criteria can't be pickled.
+# Each worker process has its own caches and invalidate_search_cache() only clears those
+# of the process it runs in, so another worker can serve a result that is stale by up to
+# the TTL. The TTLs are kept short for that reason.
+_SEARCH_CACHE = TTLCache(maxsize=1024, ttl=5)
+# Unfiltered "*" listings are the most expensive searches, keep them a little longer
+_BROWSE_ALL_CACHE = TTLCache(maxsize=64, ttl=30)
+_SEARCH_CACHE_LOCK = threading.Lock()
+
+_MISSING = object()
+
+
+def invalidate_search_cache(user_id: int = None):
+    """
+    Discards the cached search results of this process, so its next searches run against
+    the database. Call after any change to books, reading statuses, feedback or tags has
+    been committed. Other worker processes keep their cached results until they expire.
+
+    :param user_id: When given, only the searches of this user are discarded. Use it for
+        changes only that user sees, like their reading statuses, feedback and tags.
+        Otherwise, as for changes to books, all cached searches are discarded.
+    """
+    with _SEARCH_CACHE_LOCK:
+        for results_cache in (_SEARCH_CACHE, _BROWSE_ALL_CACHE):
+            if user_id is None:
+                results_cache.clear()
+            else:
+                # cache keys start with the id of the user who searched
+                for key in [key for key in results_cache if key[0] == user_id]:
+                    results_cache.pop(key, None)
+
+
 def search_by_categories(categories, status_filter: str = None,
                          feedback_filter: str = None, tag_filter: list[str] = None) -> list[Book]:
     """
@@ -26,14 +66,19 @@ def search_by_categories(categories, status_filter: str = None,
     if not categories:
         return []  # Return an empty list if no categories are provided
 
-    # Query to search and sort books based on the provided requirements
-    query = ((db.session.query(Book)
-              .filter(Book.categories_flat.in_(categories)))  # match in one of the categories
-             .order_by(asc(Book.title)))  # sort by title
+    def run_search():
+        # Query to search and sort books based on the provided requirements
+        query = ((db.session.query(Book)
+                  .filter(Book.categories_flat.in_(categories)))  # match in one of the categories
+                 .order_by(asc(Book.title)))  # sort by title
+
+        query = _add_user_status_and_feedback_loading(query)
 
-    query = _add_user_status_and_feedback_joins(query)
+        return _finish_building_query_and_execute(feedback_filter, query, status_filter,
+                                                  tag_filter)
 
-    return _finish_building_query_and_execute(feedback_filter, query, status_filter, tag_filter)
+    return _cached_search(("categories", tuple(sorted(categories))), status_filter,
+                          feedback_filter, tag_filter, run_search)
 
 
 def search_by_author(author: str, status_filter: str,
@@ -48,7 +93,7 @@ def search_by_title(title, status_filter: str, feedback_filter: str,
     return _search_by_attribute("title", title, status_filter, feedback_filter, tag_filter)
 
 
-_VALID_SEARCH_BY_ATTRIBUTES = {"author", "title"}
+_SEARCH_BY_ATTRIBUTE_COLUMNS = {"author": Book.author, "title": Book.title}
 
 
 def _search_by_attribute(attribute: str, value: str, status_filter: str = None,
@@ -67,141 +112,185 @@ def _search_by_attribute(attribute: str, value: str, status_filter: str = None,
     :rtype: list[Book]
     :raises ValueError: If the attribute provided is not valid.
     """
-    if attribute not in _VALID_SEARCH_BY_ATTRIBUTES:
+    column = _SEARCH_BY_ATTRIBUTE_COLUMNS.get(attribute)
+    if column is None:
         raise ValueError(
-            f"Invalid attribute '{attribute}'. Must be one of {_VALID_SEARCH_BY_ATTRIBUTES}."
+            f"Invalid attribute '{attribute}'. "
+            f"Must be one of {set(_SEARCH_BY_ATTRIBUTE_COLUMNS)}."
         )
     if not value:
         return []
 
-    query = _add_user_status_and_feedback_joins(db.session.query(Book))
+    def run_search():
+        query = _add_user_status_and_feedback_loading(db.session.query(Book))
+
+        # Order by the selected attribute
+        query = query.order_by(asc(column))
+
+        # Handle the special case for "*" to return all books sorted by the attribute
+        if value != "*":
+            # Perform a case-insensitive partial match. The column's _ci collation already
+            # ignores case, ilike would add a lower() call on every row for MySQL
+            query = query.filter(column.like(f"%{value}%"))
+
+        return _finish_building_query_and_execute(feedback_filter, query, status_filter,
+                                                  tag_filter)
+
+    browse_all = value == "*" and not (status_filter or feedback_filter or tag_filter)
+    return _cached_search((attribute, value), status_filter, feedback_filter, tag_filter,
+                          run_search, _BROWSE_ALL_CACHE if browse_all else _SEARCH_CACHE)
+
+
+def _current_user_id():
+    """
+    Returns the id of the logged-in user, or None when no one is logged in. Looked up once
+    per request, a request may run several searches.
+    """
+    user_id = g.get('search_user_id', _MISSING)
+    if user_id is _MISSING:
+        user_id = current_user.id if current_user.is_authenticated else None
+        g.search_user_id = user_id
+    return user_id
 
-    # Order by the selected attribute
-    query = query.order_by(asc(getattr(Book, attribute)))
 
-    # Handle the special case for "*" to return all books sorted by the attribute
-    if value != "*":
-        # Perform a case-insensitive partial match (using ilike)
-        query = query.filter(getattr(Book, attribute).ilike(f"%{value}%"))
+def _cached_search(criteria, status_filter, feedback_filter, tag_filter, run_search,
+                   results_cache=_SEARCH_CACHE):
+    """
+    Returns the books found by `run_search`, reusing the result of an identical search
+    by the same user still held in `results_cache` by this process, unless its search
+    caches have been invalidated since. A new list is returned so callers can't alter the
+    cached one.
+    """
+    user_id = _current_user_id()
+    key = (user_id, criteria, status_filter, feedback_filter, tuple(sorted(tag_filter or ())))
 
-    return _finish_building_query_and_execute(feedback_filter, query, status_filter, tag_filter)
+    with _SEARCH_CACHE_LOCK:
+        books = results_cache.get(key)
+    if books is None:
+        books = run_search()
+        with _SEARCH_CACHE_LOCK:
+            results_cache[key] = books
+    return list(books)
 
 
 def _finish_building_query_and_execute(feedback_filter, query, status_filter, tag_filter):
     query = _add_status_and_feedback_filters(query, status_filter, feedback_filter)
     # Add the tag filter if provided
-    query = query.filter(Book.tags.any(Tag.name.in_(tag_filter))) if tag_filter else query
+    if tag_filter:
+        user_id = _current_user_id()
+        # One EXISTS joining the book's tag links to the user's tags with those names
+        query = query.filter(exists().where(TagBook.book_id == Book.id,
+                                            TagBook.tag_id == Tag.id,
+                                            Tag.owner_id == user_id,
+                                            Tag.name.in_(tag_filter)))
     # execute the query
     books = query.all()
+    # Detach the books and the user data loaded with them, keeping their loaded state. The
+    # books may be reused after this session, and later queries in this session won't be
+    # handed these instances. Anything else in the session, like the current user, stays.
     for book in books:
-        make_transient(book)
-    db.session.expire_all()  # expire all books to prevent stale data from being returned
+        for loaded in (book, *book.reading_statuses, *book.feedbacks, *book.tags,
+                       *(book_tag.tag for book_tag in book.tags)):
+            if loaded in db.session:  # a tag can be shared by several books
+                db.session.expunge(loaded)
     return books
 
 
 def _add_status_and_feedback_filters(query, status_filter, feedback_filter):
+    # Join the user's status and feedback only when filtering on them
+    user_id = _current_user_id()
     if status_filter:
         if status_filter != "none":
-            # handles read and up_next
-            query = query.filter(ReadingStatus.status == status_filter)
+            # handles read and up_next, the status row must exist
+            query = (query
+                     .join(ReadingStatus, and_(ReadingStatus.book_id == Book.id,
+                                               ReadingStatus.user_id == user_id))
+                     .filter(ReadingStatus.status == status_filter))
         else:
             # finds only books without a status set
-            query = query.filter(ReadingStatus.status.is_(None))
+            query = (query
+                     .outerjoin(ReadingStatus, and_(ReadingStatus.book_id == Book.id,
+                                                    ReadingStatus.user_id == user_id))
+                     .filter(ReadingStatus.status.is_(None)))
     if feedback_filter:
         if feedback_filter != "none":
-            # handles like and dislike
-            query = query.filter(Feedback.feedback == feedback_filter)
+            # handles like and dislike, the feedback row must exist
+            query = (query
+                     .join(Feedback, and_(Feedback.book_id == Book.id,
+                                          Feedback.user_id == user_id))
+                     .filter(Feedback.feedback == feedback_filter))
         else:
             # finds only books without a feedback set
-            query = query.filter(Feedback.feedback.is_(None))
+            query = (query
+                     .outerjoin(Feedback, and_(Feedback.book_id == Book.id,
+                                               Feedback.user_id == user_id))
+                     .filter(Feedback.feedback.is_(None)))
     return query
 
 
-def _add_user_status_and_feedback_joins(query):
-    user_id = current_user.id if current_user.is_authenticated else None
+def _add_user_status_and_feedback_loading(query):
+    user_id = _current_user_id()
     if user_id:
-        # Define a constant for EXISTS check
-        # pylint: disable=invalid-name
-        # noinspection PyPep8Naming
-        EXISTS_CHECK = literal(1).label('exists_check')
-
-        # Define the subquery to check for user's tags
-        user_tag_exists = (
-            select(EXISTS_CHECK)
-            .select_from(Tag)
-            .where(
-                and_(
-                    Tag.id == TagBook.tag_id,
-                    Tag.owner_id == user_id
-                )
-            )
-            .correlate(TagBook)
-            .alias('user_tag_check')
-        )
-
         query = (
             query
-            # Join with ReadingStatus
-            .outerjoin(
-                ReadingStatus,
-                and_(
-                    ReadingStatus.book_id == Book.id,
-                    ReadingStatus.user_id == user_id
-                )
-            )
-            # Join with Feedback
-            .outerjoin(
-                Feedback,
-                and_(
-                    Feedback.book_id == Book.id,
-                    Feedback.user_id == user_id
-                )
-            )
-            # Join with TagBook using the exists subquery
-            .outerjoin(
-                TagBook,
-                and_(
-                    TagBook.book_id == Book.id,
-                    exists(user_tag_exists)
-                )
-            )
-            # Join with Tag
-            .outerjoin(
-                Tag,
-                and_(
-                    Tag.id == TagBook.tag_id,
-                    Tag.owner_id == user_id
-                )
-            )
+            # Scope every load and join of the user data in this query to the user
             .options(
-                contains_eager(Book.reading_statuses).load_only(
-                    ReadingStatus.id,
-                    ReadingStatus.status
-                ).noload(ReadingStatus.user),
-                contains_eager(Book.feedbacks).load_only(
-                    Feedback.id,
-                    Feedback.feedback
-                ).noload(Feedback.user),
-                contains_eager(Book.tags).contains_eager(TagBook.tag),
-                contains_eager(Book.tags).load_only(
-                    TagBook.id,
-                    TagBook.tag_id
-                ),
-                contains_eager(Book.tags).contains_eager(TagBook.tag).load_only(
-                    Tag.id,
-                    Tag.name,
-                    Tag.color
-                ),
-                contains_eager(Book.tags).noload(TagBook.book),
-                contains_eager(Book.tags).contains_eager(TagBook.tag).noload(Tag.owner)
+                with_loader_criteria(ReadingStatus, ReadingStatus.user_id == user_id,
+                                     include_aliases=True),
+                with_loader_criteria(Feedback, Feedback.user_id == user_id,
+                                     include_aliases=True),
+                with_loader_criteria(TagBook, TagBook.tag.has(Tag.owner_id == user_id),
+                                     include_aliases=True)
             )
+            .options(*_user_data_loading_options())
         )
     else:
-        # If no user logged in, load no relationships
-        query = query.options(
-            noload(Book.reading_statuses),
-            noload(Book.feedbacks),
-            noload(Book.tags)
-        )
+        query = query.options(*_no_user_data_loading_options())
 
     return query
+
+
+# The loader options don't depend on the user, so they are built once. Not at import time
+# though, since building them configures the mappers, which needs all models defined.
+@lru_cache(maxsize=1)
+def _user_data_loading_options():
+    # Load the user's statuses, feedback and tags with one extra SELECT each,
+    # keyed by the ids of the books found, instead of joining them into every row
+    return (
+        selectinload(Book.reading_statuses).options(
+            load_only(ReadingStatus.id, ReadingStatus.status),
+            noload(ReadingStatus.user),
+            noload(ReadingStatus.book),
+            raiseload('*')
+        ),
+        selectinload(Book.feedbacks).options(
+            load_only(Feedback.id, Feedback.feedback),
+            noload(Feedback.user),
+            noload(Feedback.book),
+            raiseload('*')
+        ),
+        selectinload(Book.tags).options(
+            load_only(TagBook.id, TagBook.tag_id),
+            noload(TagBook.book),
+            # the tag names come in the same SELECT as the user's tag links
+            joinedload(TagBook.tag, innerjoin=True).options(
+                load_only(Tag.id, Tag.name, Tag.color),
+                noload(Tag.owner),
+                raiseload('*')
+            ),
+            raiseload('*')
+        ),
+        # Anything not loaded above fails loudly instead of lazy loading per book
+        raiseload('*')
+    )
+
+
+@lru_cache(maxsize=1)
+def _no_user_data_loading_options():
+    # If no user logged in, load no relationships
+    return (
+        noload(Book.reading_statuses),
+        noload(Book.feedbacks),
+        noload(Book.tags),
+        raiseload('*')
+    )
@@ -1,13 +1,21 @@
 """
  Database service routines associated with tags.
 """
-import re
+import string
 
 import bleach
+from sqlalchemy import func, lambda_stmt, select
+from sqlalchemy.dialects.mysql import insert
 
 from app import db
 from app.helpers.tag_colors import choose_random_color
 from app.models import Tag, TagBook
+from app.services.search_service import invalidate_search_cache
+
+# Tag names may only contain letters, numbers, whitespace and hyphens
+_TAG_NAME_CHARACTERS = frozenset(string.ascii_letters + string.digits + string.whitespace + '-')
+# Characters that make a name worth passing through the HTML sanitizer
+_HTML_SENSITIVE_CHARACTERS = frozenset('<>&"\'`')
 
 
 def get_tags_for_user(user_id, q='') -> list[Tag]:
@@ -25,8 +33,12 @@ def get_tags_for_user(user_id, q='') -> list[Tag]:
     """
     query = db.session.query(Tag).filter(Tag.owner_id == user_id)
     if q:
-        query = query.filter(Tag.name.ilike(f'%{q}%'))
-    query = query.order_by(db.func.lower(Tag.name))
+        # Tag names are stored lower case and the column's _ci collation ignores case,
+        # ilike would only add a lower() call on every row for MySQL
+        query = query.filter(Tag.name.like(f'%{q.lower()}%'))
+    # already ordered without regard to case by the column's collation, and in
+    # ix_tags_owner_name order
+    query = query.order_by(Tag.name)
     return query.all()
 
 
@@ -37,26 +49,30 @@ def get_or_create_tag(user_id, tag_name) -> Tag:
     :param tag_name:
     :return:
     """
-    # First, sanitize the tag name to remove any HTML
-    tag_name = bleach.clean(tag_name, tags=[], strip=True)
+    # First, sanitize the tag name to remove any HTML. Without any of these characters
+    # there's nothing to remove, skip the parse
+    if not _HTML_SENSITIVE_CHARACTERS.isdisjoint(tag_name):
+        tag_name = bleach.clean(tag_name, tags=[], strip=True)
 
     # Then apply other validations
     if not tag_name or len(tag_name) > 32:
         raise ValueError("Tag name must be between 1 and 32 characters")
 
     # Validate tag name - allow only alphanumeric characters, hyphens, and spaces
-    if not tag_name or not re.match(r'^[a-zA-Z0-9\s\-]+$', tag_name):
+    if not _TAG_NAME_CHARACTERS.issuperset(tag_name):
         raise ValueError("Tag names can only contain letters, numbers, spaces, and hyphens")
 
     tag_name = tag_name.lower()
-    tag = db.session.query(Tag).filter(Tag.owner_id == user_id, Tag.name == tag_name).first()
+    tag = find_tag_for_user(tag_name, user_id)
     if tag:
         return tag
 
-    tag = Tag(name=tag_name, owner_id=user_id, color=choose_random_color())
-    db.session.add(tag)
+    # Insert the tag, keyed by the unique (name, owner_id), so a tag created meanwhile by
+    # another request is kept, with its color. LAST_INSERT_ID(id) hands back its id then.
+    stmt = insert(Tag).values(name=tag_name, owner_id=user_id, color=choose_random_color())
+    result = db.session.execute(stmt.on_duplicate_key_update(id=func.last_insert_id(Tag.id)))
     db.session.commit()
-    return tag
+    return db.session.get(Tag, result.lastrowid)
 
 
 def tag_book(tag_id, book_id, user_id) -> list[dict]:
@@ -79,14 +95,12 @@ def tag_book(tag_id, book_id, user_id) -> list[dict]:
         with the book. Each dictionary contains the tag name and its corresponding color.
     :rtype: list[dict]
     """
-    # Does the book already have this tag?
-    book_tag = (db.session.query(TagBook)
-                .filter(TagBook.tag_id == tag_id, TagBook.book_id == book_id)
-                .first())
-    if not book_tag:
-        book_tag = TagBook(tag_id=tag_id, book_id=book_id)
-        db.session.add(book_tag)
-        db.session.commit()
+    # Add the tag to the book, leaving it be if the book already has it. Keyed by the
+    # unique (tag_id, book_id), no need to look for it first
+    stmt = insert(TagBook).values(tag_id=tag_id, book_id=book_id)
+    db.session.execute(stmt.on_duplicate_key_update(tag_id=stmt.inserted.tag_id))
+    db.session.commit()
+    invalidate_search_cache(user_id)
 
     # return a new set of tags for the book, sorted in TagBook.id order
     return get_tags_and_colors(book_id, user_id)
@@ -96,12 +110,12 @@ def get_tags_for_user_with_colors(user_id) -> list[dict]:
     """
     Retrieve a list of tags and colors defined by a specific user.
     """
-    tags = (db.session.query(Tag)
-                 .filter(Tag.owner_id == user_id)
-                 .order_by(Tag.id)
-                 .all())
+    rows = (db.session.query(Tag.name, Tag.color)
+            .filter(Tag.owner_id == user_id)
+            .order_by(Tag.id)
+            .all())
     # return a list of tags
-    tag_and_colors = [{'value': tag.name, 'color': tag.color} for tag in tags]
+    tag_and_colors = [{'value': name, 'color': color} for name, color in rows]
     return tag_and_colors
 
 
@@ -122,16 +136,14 @@ def get_tags_and_colors(book_id, user_id):
         in the format {'tag': tag_name, 'color': tag_color}.
     :rtype: list[dict]
     """
-    tag_books = (db.session.query(TagBook)
-                 .options(db.joinedload(TagBook.tag))
-                 .join(Tag, TagBook.tag_id == Tag.id)
-                 .filter(
-        TagBook.book_id == book_id,
-        Tag.owner_id == user_id)
-                 .order_by(TagBook.id)
-                 .all())
+    # Only the name and color are needed, select just those columns rather than entities
+    rows = (db.session.query(Tag.name, Tag.color)
+            .join(TagBook, TagBook.tag_id == Tag.id)
+            .filter(TagBook.book_id == book_id, Tag.owner_id == user_id)
+            .order_by(TagBook.id)
+            .all())
     # return a list of tag and color objects for the book
-    tag_and_colors = [{'value': tb.tag.name, 'color': tb.tag.color} for tb in tag_books]
+    tag_and_colors = [{'value': name, 'color': color} for name, color in rows]
     return tag_and_colors
 
 
@@ -150,7 +162,10 @@ def find_tag_for_user(tag_name, user_id) -> Tag or None:
     :return: The matching tag instance if found, or None if no match exists.
     :rtype: Tag or None
     """
-    return db.session.query(Tag).filter(Tag.owner_id == user_id, Tag.name == tag_name).first()
+    # lambda_stmt caches the compiled SQL, tag_name and user_id become bound parameters.
+    # The name is unique per owner, so there's at most one
+    stmt = lambda_stmt(lambda: select(Tag).where(Tag.owner_id == user_id, Tag.name == tag_name))
+    return db.session.scalars(stmt).one_or_none()
 
 
 def remove_tag_from_book(tag_id, book_id, user_id):
@@ -166,8 +181,12 @@ def remove_tag_from_book(tag_id, book_id, user_id):
     :return: The updated set of tags for the specified book, including their associated
         colors sorted by their TagBook.id.
     """
-    db.session.query(TagBook).filter(TagBook.tag_id == tag_id, TagBook.book_id == book_id).delete()
+    deleted = (db.session.query(TagBook)
+               .filter(TagBook.tag_id == tag_id, TagBook.book_id == book_id)
+               .delete())
     db.session.commit()
+    if deleted:
+        invalidate_search_cache(user_id)
 
     # return a new set of tags for the book, sorted in TagBook.id order
     return get_tags_and_colors(book_id, user_id)
@@ -142,7 +142,7 @@ CREATE TABLE `books` (
   `image` text COLLATE utf8mb4_unicode_ci,
   `categories_flat` varchar(255) COLLATE utf8mb4_unicode_ci DEFAULT NULL,
   `book_description` text COLLATE utf8mb4_unicode_ci,
-  `rating` decimal(3,2) DEFAULT NULL,
+  `rating` decimal(3,2) NOT NULL DEFAULT '0.00',
   `isbn_13` varchar(17) COLLATE utf8mb4_unicode_ci DEFAULT NULL,
   `isbn_10` varchar(13) COLLATE utf8mb4_unicode_ci DEFAULT NULL,
   `hardcover` varchar(64) COLLATE utf8mb4_unicode_ci DEFAULT NULL,
@@ -170,6 +170,7 @@ CREATE TABLE `feedback` (
   `feedback` enum('like','dislike') NOT NULL,
   PRIMARY KEY (`id`),
   UNIQUE KEY `unique_user_book_feedback` (`user_id`,`book_id`),
+  KEY `ix_feedback_user_book_feedback` (`user_id`,`book_id`,`feedback`),
   KEY `book_id` (`book_id`),
   CONSTRAINT `feedback_ibfk_1` FOREIGN KEY (`user_id`) REFERENCES `user` (`id`) ON DELETE CASCADE,
   CONSTRAINT `feedback_ibfk_2` FOREIGN KEY (`book_id`) REFERENCES `books` (`id`) ON DELETE CASCADE
@@ -190,6 +191,7 @@ CREATE TABLE `reading_status` (
   `status` enum('up_next','read') NOT NULL,
   PRIMARY KEY (`id`),
   UNIQUE KEY `unique_user_book_status` (`user_id`,`book_id`),
+  KEY `ix_reading_status_user_book_status` (`user_id`,`book_id`,`status`),
   KEY `book_id` (`book_id`),
   CONSTRAINT `reading_status_ibfk_1` FOREIGN KEY (`user_id`) REFERENCES `user` (`id`) ON DELETE CASCADE,
   CONSTRAINT `reading_status_ibfk_2` FOREIGN KEY (`book_id`) REFERENCES `books` (`id`) ON DELETE CASCADE
@@ -212,6 +214,7 @@ CREATE TABLE `tags` (
   PRIMARY KEY (`id`),
   UNIQUE KEY `unique_name_per_owner` (`name`,`owner_id`),
   KEY `fk_lists_owner_idx` (`owner_id`),
+  KEY `ix_tags_owner_name` (`owner_id`,`name`),
   CONSTRAINT `fk_tags_owner` FOREIGN KEY (`owner_id`) REFERENCES `user` (`id`) ON DELETE CASCADE
 ) ENGINE=InnoDB AUTO_INCREMENT=6 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 /*!40101 SET character_set_client = @saved_cs_client */;
@@ -231,6 +234,7 @@ CREATE TABLE `tag_books` (
   UNIQUE KEY `unique_tag_book_pair` (`tag_id`,`book_id`),
   KEY `fk_tag_books_tag_idx` (`tag_id`),
   KEY `fk_tag_books_book_idx` (`book_id`),
+  KEY `ix_tag_books_book_tag` (`book_id`,`tag_id`),
   CONSTRAINT `fk_tag_books_book` FOREIGN KEY (`book_id`) REFERENCES `books` (`id`) ON DELETE CASCADE,
   CONSTRAINT `fk_tag_books_tag` FOREIGN KEY (`tag_id`) REFERENCES `tags` (`id`) ON DELETE CASCADE
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
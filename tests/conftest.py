@@ -1,8 +1,10 @@
 import sys
 import os
 
-# Add the project root directory to the Python path
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# Add the project root directory to the Python path, once
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
 
 # Set the environment variable FLASK_ENV to "testing"
 os.environ["FLASK_ENV"] = "testing"
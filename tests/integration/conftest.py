@@ -1,4 +1,5 @@
 import os
+import re
 import subprocess
 import time
 
@@ -8,10 +9,9 @@ import smtplib
 import poplib
 from pathlib import Path
 from threading import Thread
-from flask import Flask, jsonify, request
-import json
+from flask import Flask, Response, jsonify, request
+from werkzeug.serving import make_server
 from urllib.parse import urlparse
-from bs4 import BeautifulSoup
 
 import app
 from app import create_app
@@ -22,6 +22,12 @@ PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent  # Navigate to the
 DATABASE_DIR = PROJECT_ROOT / "database"
 INTEGRATION_DIR = PROJECT_ROOT / "tests" / "integration"
 
+# Sample ASIN data API response, served as is by the stub service
+ASIN_SAMPLE_RESPONSE = (INTEGRATION_DIR / "asin_sample_response.json").read_bytes()
+
+# The hidden CSRF token field of a rendered form
+CSRF_TOKEN_RE = re.compile(rb'<input[^>]*id="csrf_token"[^>]*value="([^"]+)"')
+
 
 @pytest.fixture(scope="session")
 def docker_compose():
@@ -105,10 +111,12 @@ def smtp_connection(docker_compose):
         SMTP_HOST = os.getenv("MAIL_SERVER")
     try:
         conn = smtplib.SMTP(host=SMTP_HOST, port=1025)
-        yield conn
-        conn.quit()
     except Exception as e:
         pytest.fail(f"Failed to connect to the SMTP server: {e}")
+    try:
+        yield conn
+    finally:
+        conn.quit()
 
 
 @pytest.fixture(scope="session")
@@ -120,10 +128,12 @@ def pop_connection(docker_compose):
         POP_HOST = os.getenv("MAIL_SERVER")
     try:
         conn = poplib.POP3(host=POP_HOST, port=1100)
-        yield conn
-        conn.quit()
     except Exception as e:
         pytest.fail(f"Failed to connect to the POP3 server: {e}")
+    try:
+        yield conn
+    finally:
+        conn.quit()
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -181,27 +191,22 @@ def asin_data_service(flask_app):
 
     asin_app = Flask(__name__)
 
-    # Read in the sample response data as a dictionary
-    file_path = Path(__file__).parent / "asin_sample_response.json"
-    with open(file_path, "r", encoding='utf-8') as file:
-        json_data = json.load(file)
-
     @asin_app.route('/request', methods=['GET'])
     def stub_request():
         asin = request.args.get("asin", None)
         if asin == '0':
             return jsonify({})
-        return jsonify(json_data)
+        return Response(ASIN_SAMPLE_RESPONSE, mimetype='application/json')
 
     # Run the app in a separate thread
-    def run_app():
-        asin_app.run(host=asin_host, port=asin_port)
-
-    thread = Thread(target=run_app, daemon=True)
+    server = make_server(asin_host, asin_port, asin_app, threaded=True)
+    thread = Thread(target=server.serve_forever, daemon=True)
     thread.start()
 
     yield app  # Provide the app for the fixture lifecycle
 
+    server.shutdown()
+
 
 
 @pytest.fixture
@@ -212,15 +217,19 @@ def client(flask_app):
     return flask_app.test_client()
 
 
-@pytest.fixture
-def logged_in_client(flask_app):
+@pytest.fixture(scope="session")
+def logged_in_session_cookie(flask_app):
+    """
+    Log in once per test session and keep the resulting session cookie.
+    """
     client = flask_app.test_client()
     response = client.get('/login')
     assert response.status_code == 200
 
-    # Parse the CSRF token from the response HTML
-    soup = BeautifulSoup(response.data, "html.parser")
-    csrf_token = soup.find("input", {"id": "csrf_token"})["value"]
+    # Pull the CSRF token from the login form
+    match = CSRF_TOKEN_RE.search(response.data)
+    assert match is not None
+    csrf_token = match.group(1).decode('ascii')
 
     # Log in to create a session 
     form_params = {
@@ -235,6 +244,22 @@ def logged_in_client(flask_app):
     assert response.status_code == 302
     assert response.headers["Location"] == "/"
 
+    # The test client keeps cookies under the host of the configured SERVER_NAME
+    server_host = urlparse(f"//{flask_app.config['SERVER_NAME']}").hostname
+    cookie = client.get_cookie(flask_app.config["SESSION_COOKIE_NAME"], domain=server_host)
+    assert cookie is not None
+    return cookie
+
+
+@pytest.fixture
+def logged_in_client(flask_app, logged_in_session_cookie):
+    """
+    Create a test client already logged in, with its own copy of the logged-in session.
+    """
+    client = flask_app.test_client()
+    cookie = logged_in_session_cookie
+    client.set_cookie(cookie.key, cookie.value, domain=cookie.domain,
+                      origin_only=cookie.origin_only, path=cookie.path)
     return client
 
 
@@ -4,6 +4,11 @@ import re
 from urllib.parse import urlparse
 from bs4 import BeautifulSoup
 
+# Flash messages of the book routes
+NOT_FOUND_RE = re.compile(r"Book with ID (\d+) not found\.")
+ADDED_RE = re.compile(r"Book id:(\d+) title:'(.*)' added successfully!")
+DELETED_RE = re.compile(r"Book id:(\d+) deleted successfully!")
+
 
 def test_details(logged_in_client):
 
@@ -46,27 +51,27 @@ def test_edit(logged_in_client, client):
 
     result = logged_in_client.get('/edit_book', query_string={'id': 3355})
     assert result.status_code == 302
-    cat, msg = _get_flash_message(logged_in_client)
+    cat, msg = _pop_flash_message(logged_in_client)
     assert cat == 'warning'
-    match = re.search(r"Book with ID (\d+) not found\.", msg)
+    match = NOT_FOUND_RE.search(msg)
     assert match is not None
     not_found_id = int(match.group(1))
     assert not_found_id == 3355
-    _clear_flash_messages(logged_in_client)
 
     result = logged_in_client.get('/edit_book', query_string={'id': 355})
     assert result.status_code == 200
 
     soup = BeautifulSoup(result.data, 'html.parser')
 
-    _check_form_element(soup, 'id', '355')
-    _check_form_element(soup, 'title', 'Reacher Said Nothing: Lee Child and the Making of Make Me')
-    _check_form_element(soup, 'asin', '1509540857')
-    _check_form_element(soup, 'rating', '4.0')
-    _check_form_element(soup, 'author', 'Andy Martin')
-
+    # collect the form's inputs once, check them and post them back
     form_params = {input_element['id']: input_element['value'] for input_element in
                    soup.find_all('input', {'id': True, 'value': True})}
+    assert form_params['id'] == '355'
+    assert form_params['title'] == 'Reacher Said Nothing: Lee Child and the Making of Make Me'
+    assert form_params['asin'] == '1509540857'
+    assert form_params['rating'] == '4.0'
+    assert form_params['author'] == 'Andy Martin'
+
     form_params['submit'] = 'Update Book'
     form_params['next'] = "/some_special_place?go=ok"
     # update hardcover to something new
@@ -114,12 +119,11 @@ def test_add_delete(logged_in_client, client):
     assert result.headers["Location"].endswith(form_params['next'])
 
     # Access and assert flash messages from the session
-    cat, msg = _get_flash_message(logged_in_client)
+    cat, msg = _pop_flash_message(logged_in_client)
     assert cat == 'success'
-    match = re.search(r"Book id:(\d+) title:'(.*)' added successfully\!", msg)
+    match = ADDED_RE.search(msg)
     assert match is not None
     added_book_id = int(match.group(1))
-    _clear_flash_messages(logged_in_client)
 
     delete_params = {'book_id': 'x'+str(added_book_id)}
 
@@ -133,25 +137,78 @@ def test_add_delete(logged_in_client, client):
 
     result = logged_in_client.post('/delete_book', data=delete_params)
     assert result.status_code == 200
-    cat, msg = _get_flash_message(logged_in_client)
+    cat, msg = _pop_flash_message(logged_in_client)
     assert cat == 'success'
-    match = re.search(r"Book id:(\d+) deleted successfully\!", msg)
+    match = DELETED_RE.search(msg)
     assert match is not None
     deleted_book_id = int(match.group(1))
     assert deleted_book_id == added_book_id
 
 
-def _check_form_element(soup: BeautifulSoup, element_id: str, element_value: str):
-    input_element = soup.find("input", {"id": element_id})
-    assert input_element is not None
-    assert input_element["value"] == element_value
+def test_category_tree_follows_book_changes(logged_in_client):
+    suffix = ''.join(random.choices(string.ascii_letters + string.digits, k=10))
+    added_category = f"AddedCategory{suffix}"
+    edited_category = f"EditedCategory{suffix}"
+
+    # prime the cached category tree before changing any book
+    result = logged_in_client.get('/')
+    assert result.status_code == 200
+    assert added_category not in result.text
+    assert edited_category not in result.text
+
+    result = logged_in_client.get('/add_book')
+    assert result.status_code == 200
+    soup = BeautifulSoup(result.data, 'html.parser')
+    form_params = {
+        'csrf_token': soup.find("input", {"id": "csrf_token"})["value"],
+        'title': f"Category Tree {suffix}",
+        'author': 'Test Author',
+        'categories_flat': f"{added_category} > Child",
+        'rating': '3.0',
+        'next': '/'
+    }
+    result = logged_in_client.post('/add_book', data=form_params)
+    assert result.status_code == 302
+    cat, msg = _pop_flash_message(logged_in_client)
+    assert cat == 'success'
+    added_book_id = int(ADDED_RE.search(msg).group(1))
+
+    result = logged_in_client.get('/')
+    assert result.status_code == 200
+    assert added_category in result.text
+
+    result = logged_in_client.get('/edit_book', query_string={'id': added_book_id})
+    assert result.status_code == 200
+    soup = BeautifulSoup(result.data, 'html.parser')
+    form_params = {input_element['id']: input_element['value'] for input_element in
+                   soup.find_all('input', {'id': True, 'value': True})}
+    form_params['categories_flat'] = f"{edited_category} > Child"
+    form_params['submit'] = 'Update Book'
+    form_params['next'] = '/'
+    result = logged_in_client.post('/edit_book', data=form_params)
+    assert result.status_code == 302
+
+    result = logged_in_client.get('/')
+    assert result.status_code == 200
+    assert edited_category in result.text
+    assert added_category not in result.text
+
+    result = logged_in_client.post('/delete_book', data={'book_id': added_book_id})
+    assert result.status_code == 200
+    _clear_flash_messages(logged_in_client)
+
+    result = logged_in_client.get('/')
+    assert result.status_code == 200
+    assert edited_category not in result.text
 
 
-def _get_flash_message(client) -> tuple:
+def _pop_flash_message(client) -> tuple:
+    # read the one flash message and clear it in the same session transaction
     with client.session_transaction() as session:
         flash_messages = session.get('_flashes', [])
         assert len(flash_messages) == 1
         category, message = flash_messages[0]
+        session['_flashes'] = []
     return category, message
 
 
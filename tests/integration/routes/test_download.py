@@ -96,10 +96,8 @@ def test_one_results(client):
 
 def _receive_csv_file(resp: Response):
     assert resp.mimetype == 'text/csv'
-    # Decode the binary response data to a string
-    csv_content = resp.data.decode('utf-8')
-    # Create a file-like object from the CSV string
-    csv_file = io.StringIO(csv_content)
+    # Decode the binary response data as it's read, no separate copy of the whole text
+    csv_file = io.TextIOWrapper(io.BytesIO(resp.get_data()), encoding='utf-8', newline='')
     # Use csv.DictReader to parse the CSV into a list of dictionaries
     csv_reader = csv.DictReader(csv_file)
     # Convert the reader object to a list of dictionaries
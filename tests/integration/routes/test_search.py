@@ -1,5 +1,17 @@
-from bs4 import BeautifulSoup
+import random
 import re
+import string
+
+from bs4 import BeautifulSoup
+from sqlalchemy import event
+
+# Any of the forms of the search results summary line
+SUMMARY_RE = re.compile(r"Found (?P<count>\d+) matching books\.|Found (?P<one>a) matching book\."
+                        r"|No matching books were found\.")
+
+# A book found on its own by a title search, used to follow its tags
+TAGGED_BOOK_ID = 355
+TAGGED_BOOK_TITLE = 'Reacher Said Nothing'
 
 
 def test_author_search(client):
@@ -53,27 +65,134 @@ def test_one_results(client):
     soup = BeautifulSoup(response.data, "html.parser")
     verify_number_of_results(soup, 1)
 
-    tr = soup.find("tr", {"data-id": "355"})
-    assert tr is not None
-    title_text = tr.find("span").get_text() if tr else None
-    assert title_text == "Reacher Said Nothing: Lee Child and the Making of Make Me"
+    title_span = soup.select_one('tr[data-id="355"] span')
+    assert title_span is not None
+    assert title_span.get_text() == "Reacher Said Nothing: Lee Child and the Making of Make Me"
+
+
+def test_search_query_count_is_constant(flask_app, logged_in_client):
+    from app import db
+    from app.services import invalidate_search_cache
+
+    statements = []
+
+    def count_queries(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with flask_app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", count_queries)
+    try:
+        query_counts = []
+        for query_string, expected_number_of_results in (({'author': 'rand'}, 3),
+                                                         ({'title': 'war'}, 57),
+                                                         ({'author': '*'}, 200)):
+            invalidate_search_cache()
+            statements.clear()
+            response = logged_in_client.get('/search', query_string=query_string)
+            assert response.status_code == 200
+            verify_number_of_results(BeautifulSoup(response.data, "html.parser"),
+                                     expected_number_of_results)
+            query_counts.append(len(statements))
+    finally:
+        event.remove(engine, "before_cursor_execute", count_queries)
+
+    # the user's statuses, feedback and tags are loaded with a fixed number of queries,
+    # never one per book found
+    assert max(query_counts) < 10
+
+
+def test_search_follows_tag_edits(flask_app, logged_in_client):
+    suffix = ''.join(random.choices(string.ascii_lowercase + string.digits, k=10))
+    tag_name = f"tag {suffix}"
+    renamed_tag_name = f"renamed {suffix}"
+
+    result = logged_in_client.post('/add_tag', json={'tag': tag_name, 'book_id': TAGGED_BOOK_ID})
+    assert result.status_code == 200
+
+    # prime the cached searches, with and without the tag filter
+    assert _book_tag_names(logged_in_client) == [tag_name]
+    _verify_tag_search(logged_in_client, tag_name, 1)
+
+    # rename the tag through the admin view
+    tag_id = _find_tag_id(flask_app, tag_name)
+    result = logged_in_client.get('/admin/tag/edit/', query_string={'id': tag_id})
+    assert result.status_code == 200
+    soup = BeautifulSoup(result.data, 'html.parser')
+    form_params = {input_element['name']: input_element.get('value', '') for input_element in
+                   soup.find_all('input', {'name': True})}
+    form_params['name'] = renamed_tag_name
+    form_params['color'] = soup.find('select', {'name': 'color'}).find('option')['value']
+    result = logged_in_client.post('/admin/tag/edit/', query_string={'id': tag_id},
+                                   data=form_params)
+    assert result.status_code == 302
+
+    assert _book_tag_names(logged_in_client) == [renamed_tag_name]
+    _verify_tag_search(logged_in_client, tag_name, 0)
+    _verify_tag_search(logged_in_client, renamed_tag_name, 1)
+
+    # and delete it through the admin view
+    result = logged_in_client.post('/admin/tag/delete/', data={'id': tag_id})
+    assert result.status_code == 302
+
+    assert _book_tag_names(logged_in_client) == []
+    _verify_tag_search(logged_in_client, renamed_tag_name, 0)
+
+
+def _find_tag_id(flask_app, tag_name) -> int:
+    from app import user_datastore, INITIAL_USER_EMAIL
+    from app.services import find_tag_for_user
+    with flask_app.app_context():
+        user = user_datastore.find_user(email=INITIAL_USER_EMAIL)
+        return find_tag_for_user(user_id=user.id, tag_name=tag_name).id
+
+
+def _book_tag_names(client) -> list:
+    response = client.get('/search', query_string={'title': TAGGED_BOOK_TITLE})
+    assert response.status_code == 200
+    soup = BeautifulSoup(response.data, "html.parser")
+    tags = soup.select_one(f'#book-tags-results-{TAGGED_BOOK_ID}')
+    assert tags is not None
+    return [badge.get_text() for badge in tags.select('span.badge')]
+
+
+def _verify_tag_search(client, tag_name, expected_number_of_results):
+    response = client.get('/search', query_string={'title': TAGGED_BOOK_TITLE, 'tag': tag_name})
+    assert response.status_code == 200
+    verify_number_of_results(BeautifulSoup(response.data, "html.parser"),
+                             expected_number_of_results)
+
+
+def test_search_leaves_other_session_objects_attached(flask_app):
+    from app import db
+    from app.models import Book
+    from app.services import invalidate_search_cache, search_by_title
+
+    with flask_app.test_request_context():
+        invalidate_search_cache()
+        # loaded earlier in the request, not one of the books found
+        other_book = db.session.get(Book, 285)
+        assert other_book is not None
+
+        books = search_by_title(TAGGED_BOOK_TITLE, None, None, None)
+        assert [book.id for book in books] == [TAGGED_BOOK_ID]
+
+        # only the books found are detached, they may be reused by later requests
+        assert books[0] not in db.session
+        assert other_book in db.session
 
 
 def verify_number_of_results(soup, expected_number_of_results):
     # Get the results summary line
     summary_line = soup.find("span", {"id": "search-results-summary"}).get_text()
 
-    if expected_number_of_results == 0:
-        match =  re.search(r"No matching books were found\.", summary_line)
-        number_of_matched_books = 0 if match else None
-    elif expected_number_of_results == 1:
-        match = re.search(r"Found a matching book\.", summary_line)
-        number_of_matched_books = 1 if match else None
-    else:
-        match = re.search(r"Found (\d+) matching books\.", summary_line)
-        number_of_matched_books = int(match.group(1)) if match else None
-
+    match = SUMMARY_RE.search(summary_line)
     assert match is not None, "Summary line did not match the expected format."
+
+    if match['count']:
+        number_of_matched_books = int(match['count'])
+    else:
+        number_of_matched_books = 1 if match['one'] else 0
     assert number_of_matched_books == expected_number_of_results
 
 
@@ -98,3 +98,60 @@ def test_feedback(client, logged_in_client):
     assert book is not None
     assert book['feedback'] == 'none'
 
+
+
+def _rows_for_book(db_connection, table, book_id):
+    db_connection.commit()  # end any open transaction so the query sees the latest rows
+    with db_connection.cursor() as cursor:
+        cursor.execute(f"SELECT user_id, book_id FROM {table} WHERE book_id = %s", (book_id,))
+        return cursor.fetchall()
+
+
+def test_status_upsert_and_remove(logged_in_client, db_connection):
+    params = {'book_id': '356', 'status': 'read'}
+    result = logged_in_client.post('/change_status', data=params)
+    assert result.status_code == 200
+
+    params['status'] = 'up_next'  # second set updates the same row
+    result = logged_in_client.post('/change_status', data=params)
+    assert result.status_code == 200
+
+    rows = _rows_for_book(db_connection, 'reading_status', 356)
+    assert len(rows) == 1
+    assert len({(row['user_id'], row['book_id']) for row in rows}) == 1
+
+    result = logged_in_client.get('/details', query_string={'id': 356})
+    assert result.json['status'] == 'up_next'
+
+    params['status'] = 'none'
+    result = logged_in_client.post('/change_status', data=params)
+    assert result.status_code == 200
+
+    assert not _rows_for_book(db_connection, 'reading_status', 356)
+    result = logged_in_client.get('/details', query_string={'id': 356})
+    assert result.json['status'] == 'none'
+
+
+def test_feedback_upsert_and_remove(logged_in_client, db_connection):
+    params = {'book_id': '356', 'feedback': 'like'}
+    result = logged_in_client.post('/change_feedback', data=params)
+    assert result.status_code == 200
+
+    params['feedback'] = 'dislike'  # second set updates the same row
+    result = logged_in_client.post('/change_feedback', data=params)
+    assert result.status_code == 200
+
+    rows = _rows_for_book(db_connection, 'feedback', 356)
+    assert len(rows) == 1
+    assert len({(row['user_id'], row['book_id']) for row in rows}) == 1
+
+    result = logged_in_client.get('/details', query_string={'id': 356})
+    assert result.json['feedback'] == 'dislike'
+
+    params['feedback'] = 'none'
+    result = logged_in_client.post('/change_feedback', data=params)
+    assert result.status_code == 200
+
+    assert not _rows_for_book(db_connection, 'feedback', 356)
+    result = logged_in_client.get('/details', query_string={'id': 356})
+    assert result.json['feedback'] == 'none'
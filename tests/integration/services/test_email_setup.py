@@ -1,3 +1,4 @@
+from email.mime.text import MIMEText
 
 SUBJECT = "Welcome to bookllist!"
 BODY = """
@@ -7,18 +8,13 @@ FROM = "admin@localhost"
 MAILBOX = "user"
 MAILBOX_PASSWORD = ""
 TO = MAILBOX + "@localhost"
+BODY_LINES = 20  # well past the end of BODY
+
 
 def test_send_email_and_receive(smtp_connection, pop_connection):
     """Test sending and receiving an email."""
-    from email.mime.text import MIMEText
-
     # Send an email
-    msg = MIMEText(BODY)
-    msg["Subject"] = SUBJECT
-    msg["From"] = FROM
-    msg["To"] = TO
-
-    smtp_connection.send_message(msg)
+    smtp_connection.sendmail(FROM, [TO], _message_bytes())
 
     # Check it in the POP mailbox
     pop_connection.user(MAILBOX)
@@ -27,9 +23,17 @@ def test_send_email_and_receive(smtp_connection, pop_connection):
     email_count = len(pop_connection.list()[1])
     assert email_count > 0
 
-    # Retrieve emails and verify content
+    # Retrieve the headers and the start of each email's body and verify content
     for i in range(1, email_count + 1):
-        _, email_lines, _ = pop_connection.retr(i)
+        _, email_lines, _ = pop_connection.top(i, BODY_LINES)
         email_content = b"\n".join(email_lines).decode("utf-8")
         assert BODY in email_content
         assert SUBJECT in email_content
+
+
+def _message_bytes() -> bytes:
+    msg = MIMEText(BODY)
+    msg["Subject"] = SUBJECT
+    msg["From"] = FROM
+    msg["To"] = TO
+    return msg.as_bytes()
@@ -3,12 +3,10 @@ This module defines a SQL parsing utility that extracts SQL queries from a scrip
 
 It utilizes an ANTLR-generated MySQL lexer and parser to process SQL scripts and identify
 individual queries. The `SQLParser` class reads a SQL script file, parses it into a parse
-tree from the root rule, and uses a listener to extract SQL statements.
+tree from the root rule, and extracts the SQL statements from its query nodes.
 
 Classes:
     - SQLParser: Provides functionality to parse a SQL script and extract its queries.
-    - _QueryExtractorListener: An internal listener class used to extract queries from
-      the parse tree during traversal.
 
 Dependencies:
     - ANTLR4 runtime for Python
@@ -16,14 +14,12 @@ Dependencies:
 """
 from typing import Iterator, List
 
-from antlr4 import FileStream, CommonTokenStream, Token
+from antlr4 import FileStream, CommonTokenStream
 from antlr4.Parser import Parser
-from antlr4.error.ErrorListener import ErrorListener
-from antlr4.error.ErrorStrategy import DefaultErrorStrategy
-from antlr4.tree.Tree import ParseTreeListener, ParseTreeWalker
-
-from tests.integration.sql_parser.grammars.antlr_generated.MySQLLexer import MySQLLexer
-from tests.integration.sql_parser.grammars.antlr_generated.MySQLParser import MySQLParser
+from antlr4.atn.PredictionMode import PredictionMode
+from antlr4.error.ErrorListener import ConsoleErrorListener, ErrorListener
+from antlr4.error.ErrorStrategy import BailErrorStrategy, DefaultErrorStrategy
+from antlr4.error.Errors import ParseCancellationException
 
 
 class SQLParser:  # pylint: disable=too-few-public-methods
@@ -37,25 +33,40 @@ class SQLParser:  # pylint: disable=too-few-public-methods
     :ivar queries: List of extracted SQL queries from the provided file.
     :type queries: list
     """
-    queries: List[str] = []
-    error_listener = None
-
     def __init__(self, file_path, encoding="utf-8"):
+        # The generated lexer and parser deserialize their ATNs when imported, so only pay
+        # for that when a script is actually parsed, not when this module is collected
+        # pylint: disable=import-outside-toplevel
+        from tests.integration.sql_parser.grammars.antlr_generated.MySQLLexer import MySQLLexer
+        from tests.integration.sql_parser.grammars.antlr_generated.MySQLParser import MySQLParser
+
+        self.queries: List[str] = []
+        self.error_listener = _MySQLCustomErrorListener()
+
         input_stream = FileStream(file_path, encoding=encoding)
         lexer = MySQLLexer(input_stream)
         token_stream = CommonTokenStream(lexer)
         parser = MySQLParser(token_stream)
-        parser._errHandler = _MySQLErrorStrategy()
-        self.error_listener = _MySQLCustomErrorListener()
-        parser.addErrorListener(self.error_listener)
-        tree = parser.queries()  # Start parsing from the root rule
 
-        # Use the _QueryExtractorListener to extract queries
-        listener = _QueryExtractorListener(token_stream)
-        walker = ParseTreeWalker()
-        walker.walk(listener, tree)
-        # Save the statements we find
-        self.queries = listener.get_queries()
+        # Try the much faster SLL prediction first, bailing out on the first error.  Only
+        # when that fails do we pay for full LL prediction with our error recovery.
+        parser._interp.predictionMode = PredictionMode.SLL
+        parser.removeErrorListeners()
+        parser._errHandler = BailErrorStrategy()
+        try:
+            tree = parser.queries()  # Start parsing from the root rule
+        except ParseCancellationException:
+            token_stream.reset()
+            parser.reset()
+            parser._errHandler = _MySQLErrorStrategy()
+            parser.addErrorListener(ConsoleErrorListener.INSTANCE)
+            parser.addErrorListener(self.error_listener)
+            parser._interp.predictionMode = PredictionMode.LL
+            tree = parser.queries()
+
+        # Queries are the direct children of the root rule.  Save the text of each one,
+        # reconstructed from the token stream to preserve the original formatting.
+        self.queries = [token_stream.getText(query.start, query.stop) for query in tree.query()]
 
     def statements(self) -> Iterator[str]:
         """
@@ -84,40 +95,6 @@ class SQLParser:  # pylint: disable=too-few-public-methods
         return self.error_listener.get_errors()
 
 
-class _QueryExtractorListener(ParseTreeListener):
-    def __init__(self, token_stream: CommonTokenStream):
-        self.queries: List[str] = []
-        self.token_stream = token_stream  # Save the token stream for reconstructing queries
-
-    # noinspection PyPep8Naming
-    def enterQuery(self, ctx: MySQLParser.QueryContext):  # pylint: disable=invalid-name
-        """
-        Extracts and stores the text of each 'query' node, preserving whitespace.
-
-        This method reconstructs the SQL query from tokens, ensuring that
-        the original formatting (like spaces, newlines) is preserved.
-        """
-        start_token = ctx.start.tokenIndex
-        stop_token = ctx.stop.tokenIndex
-        # Reconstruct the query text using tokens from the token stream
-        tokens = self.token_stream.getTokens(start_token, stop_token)
-        query = ''.join(token.text for token in tokens if token.type != Token.EOF)
-        self.queries.append(query)
-
-    def get_queries(self) -> list[str]:
-        """
-        Retrieves a list of stored queries.
-
-        This method returns the collection of queries that are currently stored
-        within the instance. The queries are expected to be in the form of strings
-        and grouped together in a list.
-
-        :return: A list of queries stored in the instance.
-        :rtype: list[str]
-        """
-        return self.queries
-
-
 class _MySQLErrorStrategy(DefaultErrorStrategy):
     """
     When this method is called, the parser has already decided that it can
@@ -139,13 +116,13 @@ class _MySQLErrorStrategy(DefaultErrorStrategy):
         #  /*!40101 SET @OLD_CHARACTER_SET_RESULTS=@@CHARACTER_SET_RESULTS */;
         #
         # where a file might start with multiple version comments.
-        current_token = recognizer.getCurrentToken()
-        if current_token.text == ';':
+        semicolon_token_type = recognizer.SEMICOLON_SYMBOL
+        if recognizer.getCurrentToken().type == semicolon_token_type:
             # consume and discard successive : to get to the next token, i.e. treat
             # multiple semicolons as a single one to delete
-            semicolon_token_type = current_token.type
+            token_stream = recognizer.getTokenStream()
             # while the next token is also a semicolon
-            while recognizer.getTokenStream().LA(2) == semicolon_token_type:
+            while token_stream.LA(2) == semicolon_token_type:
                 # keep bumping up
                 recognizer.consume()
             # At this point, the next token is NOT a semicolon, the current token
@@ -13,4 +13,11 @@ def test_build_library_search_urls():
     assert scc_url is not None
     assert scc_url.startswith('https://sccl.bibliocommons.com/v2/search?')
     assert 'The+Hitchhiker%27s+Guide+to+the+Galaxy' in scc_url
-    assert 'Douglas+Adams' in scc_url
\ No newline at end of file
+    assert 'Douglas+Adams' in scc_url
+
+
+def test_build_library_search_urls_returns_a_new_dict():
+    search_urls = build_library_search_urls(AUTHOR, TITLE)
+    search_urls.clear()
+
+    assert len(build_library_search_urls(AUTHOR, TITLE)) == len(_SEARCH_TEMPLATES)
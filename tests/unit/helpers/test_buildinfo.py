@@ -1,6 +1,7 @@
-import json
 import logging
 
+import orjson
+
 from app.helpers import (read_build_info, write_empty_build_info,
                          BUILD_INFO_FILE, buildinfo)
 from dulwich.errors import NotGitRepository
@@ -132,8 +133,7 @@ def _write_old_build_info():
     }
 
     # Write to build-info.json file
-    with open(BUILD_INFO_FILE, 'w') as f:
-        json.dump(build_info, f, indent=4)
+    BUILD_INFO_FILE.write_bytes(orjson.dumps(build_info))
 
 
 def _get_build_info_last_modified():
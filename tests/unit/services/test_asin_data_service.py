@@ -3,14 +3,14 @@ from flask import Flask
 from app.services import fetch_product_details
 
 
-def test_fetch_product_details_no_api_key(mocker):
+def test_fetch_product_details_no_api_key():
     # Create a Flask app instance
     app = Flask(__name__)
 
     # Within the application's context
     with app.app_context():
-        # Mock `current_app.config` so that 'ASIN_DATA_API_KEY' returns `None`
-        mocker.patch.dict(app.config, {"ASIN_DATA_API_KEY": None})
+        # The app is local to this test, so its config can be set directly
+        app.config["ASIN_DATA_API_KEY"] = None
 
         # Provide a sample ASIN for the test
         sample_asin = "B08K9347FG"
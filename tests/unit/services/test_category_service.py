@@ -0,0 +1,36 @@
+from app.services.category_service import _build_category_bs_tree, id_to_fullpath
+
+
+def _texts(nodes):
+    return [node["text"] for node in nodes]
+
+
+def test_build_category_bs_tree_nests_children(mocker):
+    mocker.patch("app.services.category_service._get_category_prefixes",
+                 return_value=["Fiction", "Fiction > Fantasy", "Fiction > Fantasy > Epic",
+                               "History"])
+
+    bs_tree = _build_category_bs_tree()
+
+    assert _texts(bs_tree) == ["Fiction", "History"]
+    fantasy = bs_tree[0]["nodes"][0]
+    assert fantasy["text"] == "Fantasy"
+    assert fantasy["fullpath"] == "Fiction > Fantasy"
+    assert _texts(fantasy["nodes"]) == ["Epic"]
+    assert "nodes" not in bs_tree[1]
+    assert id_to_fullpath(fantasy["id"]) == "Fiction > Fantasy"
+
+
+def test_build_category_bs_tree_case_variant_prefixes(mocker):
+    # Only the 'Fiction' spelling of the top level came back, but a child uses
+    # 'fiction'; the child must not be promoted to a root node
+    mocker.patch("app.services.category_service._get_category_prefixes",
+                 return_value=["Fiction", "Fiction > A", "fiction > B"])
+
+    bs_tree = _build_category_bs_tree()
+
+    assert _texts(bs_tree) == ["Fiction", "fiction"]
+    assert _texts(bs_tree[0]["nodes"]) == ["A"]
+    assert _texts(bs_tree[1]["nodes"]) == ["B"]
+    assert bs_tree[1]["nodes"][0]["fullpath"] == "fiction > B"
+    assert "B" not in _texts(bs_tree)
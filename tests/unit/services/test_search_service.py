@@ -0,0 +1,31 @@
+from app.services import search_service
+from app.services.search_service import invalidate_search_cache
+
+
+def _fill_caches():
+    invalidate_search_cache()
+    for user_id in (None, 1, 2):
+        search_service._SEARCH_CACHE[(user_id, ("title", "war"), None, None, ())] = ["war"]
+        search_service._BROWSE_ALL_CACHE[(user_id, ("author", "*"), None, None, ())] = ["all"]
+
+
+def _cached_users(results_cache):
+    return {key[0] for key in results_cache}
+
+
+def test_invalidate_search_cache_for_one_user():
+    _fill_caches()
+
+    invalidate_search_cache(1)
+
+    assert _cached_users(search_service._SEARCH_CACHE) == {None, 2}
+    assert _cached_users(search_service._BROWSE_ALL_CACHE) == {None, 2}
+
+
+def test_invalidate_search_cache_for_everyone():
+    _fill_caches()
+
+    invalidate_search_cache()
+
+    assert len(search_service._SEARCH_CACHE) == 0
+    assert len(search_service._BROWSE_ALL_CACHE) == 0
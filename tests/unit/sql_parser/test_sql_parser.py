@@ -1,4 +1,4 @@
-import logging
+import inspect
 from pathlib import Path
 
 import pytest
@@ -11,17 +11,13 @@ DATABASE_DIR = PROJECT_ROOT / "database"
 
 
 @pytest.mark.skip(reason="not needed")
-def test_sql_parser():
-    files = ["create-tables.sql", "initial-books-load.sql"]
-    for file in files:
-        sql_file = DATABASE_DIR / file
-        assert sql_file.exists()
+@pytest.mark.parametrize("file", ["create-tables.sql", "initial-books-load.sql"])
+def test_sql_parser(file):
+    sql_file = DATABASE_DIR / file
+    assert sql_file.exists()
 
-        print(f"\n\nParsing {sql_file}...")
-        parser = SQLParser(sql_file)
-        assert parser.has_errors() is False
-        cnt = 0
-        for statement in parser.statements():
-            cnt += 1
-            logging.debug(">>> %s", statement)
-        assert cnt > 0
+    parser = SQLParser(sql_file)
+    assert parser.has_errors() is False
+    statements = parser.statements()
+    assert inspect.isgenerator(statements)
+    assert sum(1 for _ in statements) > 0